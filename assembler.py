@@ -4,12 +4,13 @@
 """
 
 import argparse
+import functools
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from parser import YamlParser
 from encoder import CommandEncoder
+from cli import split_path_pair
 from spec import UVMSpec
 
 class UVMAssembler:
@@ -40,6 +41,7 @@ class UVMAssembler:
             print(f"{'='*60}")
             print(f"Входной файл: {input_yaml}")
             
+            self.parser.verbose = test_mode
             self.intermediate = self.parser.parse(input_yaml)
             
             if test_mode:
@@ -51,24 +53,56 @@ class UVMAssembler:
             print(f"{'='*60}")
             print(f"Выходной файл: {output_bin}")
             
-            self.binary_data = self.encoder.encode_program(self.intermediate)
+            self.binary_data = self.encoder.encode_program(
+                self.intermediate, keep_listing=test_mode
+            )
             self.encoder.save_to_file(output_bin)
             
             if test_mode:
                 self.encoder.print_encoded_commands()
             
             # Вывод статистики
-            self._print_statistics(output_bin)
+            self._print_statistics(output_bin, verify=test_mode)
             
             return True
             
         except Exception as e:
-            print(f"\n✗ ОШИБКА: {e}")
+            print(f"\n✗ ОШИБКА: {e}", file=sys.stderr)
             return False
     
-    def _print_statistics(self, output_path):
+    def assemble_incremental(self, input_yaml, output_bin, changed_lines=None):
+        """
+        Повторно ассемблирует программу, перекодируя только измененные команды.
+        
+        Используется при многократной сборке одного и того же файла
+        (режим наблюдения, IDE). Первый вызов выполняет полное кодирование.
+        
+        Args:
+            input_yaml: Путь к входному YAML файлу
+            output_bin: Путь к выходному бинарному файлу
+            changed_lines: Номера измененных команд (None - проверить все)
+            
+        Returns:
+            bool: True если успешно, False в противном случае
+        """
+        try:
+            self.intermediate = self.parser.parse(input_yaml)
+            self.binary_data = self.encoder.encode_incremental(
+                self.intermediate, changed_lines
+            )
+            self.encoder.save_to_file(output_bin)
+            
+            print(f"✓ Перекодировано команд: {self.encoder.dirty_count} "
+                  f"из {len(self.intermediate)}")
+            return True
+            
+        except Exception as e:
+            print(f"\n✗ ОШИБКА: {e}", file=sys.stderr)
+            return False
+    
+    def _print_statistics(self, output_path, verify=False):
         """Выводит статистику ассемблирования."""
-        stats = self.encoder.get_statistics(output_path)
+        stats = self.encoder.get_statistics(output_path, verify)
         
         print(f"\n{'='*60}")
         print("СТАТИСТИКА АССЕМБЛИРОВАНИЯ:")
@@ -88,65 +122,147 @@ class UVMAssembler:
             print("  3. WRITE_MEM:  0x49, 0xC3, 0x00, 0x00")
             print("  4. ABS:        0x99, 0xB6, 0x00, 0x00")
 
-def main():
-    """Точка входа в программу."""
+@functools.lru_cache(maxsize=None)
+def _build_parser():
+    """Создает парсер аргументов командной строки (один раз за процесс)."""
     parser = argparse.ArgumentParser(
         description='Ассемблер для учебной виртуальной машины (УВМ) - Вариант №3\n'
                     'Этапы 1-2: Парсинг YAML и генерация машинного кода',
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog='Примеры использования:\n'
                '  python assembler.py program.yaml output.bin\n'
-               '  python assembler.py test_program.asm.yaml test.bin --test'
+               '  python assembler.py test_program.asm.yaml test.bin --test\n'
+               '  python assembler.py program.yaml output.bin --skip-unchanged\n'
+               '  python assembler.py --batch a.yaml:a.bin b.yaml:b.bin'
     )
     
     parser.add_argument(
         'input_file',
+        nargs='?',
         help='Путь к YAML файлу с программой на ассемблере УВМ'
     )
     
     parser.add_argument(
         'output_file',
+        nargs='?',
         help='Путь для сохранения бинарного файла с машинным кодом'
     )
     
+    parser.add_argument(
+        '--batch',
+        nargs='+',
+        metavar='SRC:DST',
+        help='Ассемблировать несколько программ за один запуск (пары YAML:BIN)'
+    )
+    
     parser.add_argument(
         '--test',
         action='store_true',
         help='Режим тестирования с подробным выводом промежуточных данных'
     )
     
+    parser.add_argument(
+        '--skip-unchanged',
+        action='store_true',
+        help='Не ассемблировать повторно, если выходной файл новее входного'
+    )
+    
     parser.add_argument(
         '--version',
         action='version',
         version='Ассемблер УВМ v1.0 (Вариант №3)'
     )
     
-    args = parser.parse_args()
+    return parser
+
+def is_up_to_date(input_file, output_file):
+    """
+    Проверяет, что выходной файл не старше входного.
     
+    Returns:
+        bool: True если выходной файл существует и его mtime >= mtime входного
+    """
+    try:
+        return os.stat(output_file).st_mtime >= os.stat(input_file).st_mtime
+    except FileNotFoundError:
+        return False
+
+def run(assembler, input_file, output_file, test_mode=False, skip_unchanged=False):
+    """
+    Ассемблирует программу с выводом заголовка и итога, как в CLI.
+    
+    Позволяет вызывать ассемблер из другого кода без разбора argv.
+    
+    Args:
+        assembler: Экземпляр UVMAssembler
+        input_file: Путь к входному YAML файлу
+        output_file: Путь к выходному бинарному файлу
+        test_mode: Режим тестирования
+        skip_unchanged: Пропустить сборку, если выходной файл не старше входного
+        
+    Returns:
+        bool: True если успешно, False в противном случае
+    """
     # Проверяем существование входного файла
-    if not os.path.exists(args.input_file):
-        print(f"✗ Ошибка: Входной файл '{args.input_file}' не найден")
-        sys.exit(1)
+    if not os.path.exists(input_file):
+        print(f"✗ Ошибка: Входной файл '{input_file}' не найден", file=sys.stderr)
+        return False
     
-    # Создаем и запускаем ассемблер
+    if skip_unchanged and is_up_to_date(input_file, output_file):
+        print(f"♻️ Файл '{output_file}' актуален, ассемблирование пропущено")
+        return True
+    
+    # Запускаем ассемблер
     print(f"{'='*60}")
     print("АССЕМБЛЕР УЧЕБНОЙ ВИРТУАЛЬНОЙ МАШИНЫ (УВМ)")
     print("Вариант №3 | РТУ МИРЭА | Конфигурационное управление")
     print(f"{'='*60}")
     
-    assembler = UVMAssembler()
-    
-    if args.test:
+    if test_mode:
         print("⚡ РЕЖИМ ТЕСТИРОВАНИЯ: ВКЛЮЧЕН")
     
-    success = assembler.assemble(args.input_file, args.output_file, args.test)
+    success = assembler.assemble(input_file, output_file, test_mode)
     
     if success:
         print(f"\n✅ АССЕМБЛИРОВАНИЕ ЗАВЕРШЕНО УСПЕШНО!")
         print(f"{'='*60}")
     else:
-        print(f"\n❌ АССЕМБЛИРОВАНИЕ ЗАВЕРШЕНО С ОШИБКАМИ")
+        print(f"\n❌ АССЕМБЛИРОВАНИЕ ЗАВЕРШЕНО С ОШИБКАМИ", file=sys.stderr)
+    
+    return success
+
+def main(argv=None):
+    """
+    Точка входа в программу.
+    
+    Args:
+        argv: Аргументы командной строки (None - взять из sys.argv)
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    
+    if args.batch:
+        if args.input_file or args.output_file:
+            parser.error("--batch нельзя совмещать с input_file и output_file")
+        try:
+            pairs = [split_path_pair(pair) for pair in args.batch]
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.input_file and args.output_file:
+        pairs = [(args.input_file, args.output_file)]
+    else:
+        parser.error("требуются input_file и output_file (или --batch)")
+    
+    # Все программы ассемблируются в одном процессе; ошибка в одной
+    # из них не прерывает сборку остальных
+    failed = [
+        input_file for input_file, output_file in pairs
+        if not run(UVMAssembler(), input_file, output_file, args.test,
+                   args.skip_unchanged)
+    ]
+    
+    if failed:
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,24 @@
+"""
+Общие утилиты командной строки ассемблера и интерпретатора.
+"""
+
+import re
+
+# Пара путей SRC:DST; путь может начинаться с буквы диска Windows (C:)
+_PATH_PAIR = re.compile(r'((?:[A-Za-z]:)?[^:]+):((?:[A-Za-z]:)?[^:]+)')
+
+
+def split_path_pair(pair):
+    """
+    Разбирает пару путей вида 'SRC:DST' (аргумент --batch).
+    
+    Returns:
+        tuple: (путь к исходному файлу, путь к результату)
+        
+    Raises:
+        ValueError: Если строка не является парой путей
+    """
+    match = _PATH_PAIR.fullmatch(pair)
+    if match is None:
+        raise ValueError(f"Ожидается пара путей ИСТОЧНИК:РЕЗУЛЬТАТ, получено: '{pair}'")
+    return match.group(1), match.group(2)
@@ -4,8 +4,91 @@ encoder.py
 Этап 2: Кодирование промежуточного представления в машинный код.
 """
 
+import mmap
 import os
-from spec import UVMSpec
+import struct
+import sys
+from array import array
+from collections import namedtuple
+from spec import UVMSpec, IntermediateProgram
+
+# Строка таблицы команд: ключ исходной команды, смещение и размер в бинарнике
+LineEntry = namedtuple('LineEntry', ['src_key', 'byte_offset', 'size'])
+
+# Упаковщик 32-битного слова команды (little-endian)
+_WORD = struct.Struct('<I')
+
+# Код типа array для 32-битного беззнакового слова на данной платформе
+_WORD_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+# Размер программы, начиная с которого файл записывается через mmap
+_MMAP_THRESHOLD = 64 * 1024
+
+
+def _make_packer(opcode):
+    """
+    Создает упаковщик команды для конкретного опкода.
+    
+    Маски и сдвиги полей подставляются в замыкание один раз, а поле A
+    для фиксированного опкода вычисляется заранее.
+    
+    Returns:
+        function: pack(b, c) -> значение команды
+    """
+    masks = UVMSpec.get_field_masks(opcode)
+    mask_a, shift_a = masks['A']
+    mask_b, shift_b = masks['B']
+    mask_c, shift_c = masks['C']
+    base = (opcode & mask_a) << shift_a
+    
+    def pack(b, c):
+        return base | ((b & mask_b) << shift_b) | ((c & mask_c) << shift_c)
+    
+    return pack
+
+
+# Формат каждого опкода: (упаковщик, размер команды в байтах), создается один раз
+_FORMATS = {
+    opcode: (_make_packer(opcode), UVMSpec.COMMAND_SIZES.get(opcode, 4))
+    for opcode in UVMSpec.OPCODE_NAMES
+}
+
+
+def _get_format(opcode):
+    """Возвращает (упаковщик, размер) для опкода (для неизвестных - на лету)."""
+    fmt = _FORMATS.get(opcode)
+    if fmt is None:
+        fmt = (_make_packer(opcode), UVMSpec.COMMAND_SIZES.get(opcode, 4))
+    return fmt
+
+
+def _command_key(opcode, b, c):
+    """
+    Возвращает ключ исходной команды для таблицы команд.
+    
+    Хранится сам кортеж полей, а не его хэш: совпадение хэшей разных
+    команд не должно пропускать изменившуюся команду.
+    """
+    return opcode, b, c
+
+
+def _pack_words(opcodes, operands_b, operands_c):
+    """
+    Упаковывает столбцы опкодов и операндов в значения команд.
+    
+    Горячий цикл кодирования: работает с плоскими последовательностями
+    чисел, без обращений к словарям команд и маскам из UVMSpec.
+    
+    Returns:
+        tuple: (список значений команд, список размеров команд)
+    """
+    words = []
+    sizes = []
+    for opcode, b, c in zip(opcodes, operands_b, operands_c):
+        pack, size = _get_format(opcode)
+        words.append(pack(b, c))
+        sizes.append(size)
+    return words, sizes
 
 class CommandEncoder:
     """Кодировщик команд УВМ в машинный код."""
@@ -13,6 +96,57 @@ class CommandEncoder:
     def __init__(self):
         self.binary_data = bytearray()
         self.encoded_commands = []
+        self._line_table = []
+        self.dirty_count = 0
+    
+    @staticmethod
+    def _columns(intermediate_repr):
+        """Возвращает столбцы (опкоды, B, C) промежуточного представления."""
+        if isinstance(intermediate_repr, IntermediateProgram):
+            return intermediate_repr.opcodes, intermediate_repr.B, intermediate_repr.C
+        
+        return ([cmd.opcode for cmd in intermediate_repr],
+                [cmd.B for cmd in intermediate_repr],
+                [cmd.C for cmd in intermediate_repr])
+    
+    def _pack_fields(self, cmd):
+        """
+        Собирает битовые поля команды в одно целое число.
+        
+        Args:
+            cmd: Команда в промежуточном представлении
+            
+        Returns:
+            tuple: (значение команды, размер команды в байтах)
+        """
+        pack, size = _get_format(cmd.opcode)
+        
+        return pack(cmd.B, cmd.C), size
+    
+    def _store_value(self, value, size, offset):
+        """Записывает значение команды в binary_data по смещению (little-endian)."""
+        if size == _WORD.size:
+            _WORD.pack_into(self.binary_data, offset, value)
+        else:
+            self.binary_data[offset:offset + size] = value.to_bytes(size, byteorder='little')
+    
+    def _write_command(self, cmd, offset):
+        """
+        Записывает закодированную команду в binary_data по смещению.
+        
+        Returns:
+            int: Размер записанной команды в байтах
+        """
+        value, size = self._pack_fields(cmd)
+        self._store_value(value, size, offset)
+        return size
+    
+    def _listing_entry(self, cmd, offset, size):
+        """Создает запись листинга для print_encoded_commands."""
+        return {
+            'command': cmd,
+            'bytes': bytes(self.binary_data[offset:offset + size])
+        }
     
     def encode_command(self, cmd):
         """
@@ -24,54 +158,105 @@ class CommandEncoder:
         Returns:
             bytes: Байтовое представление команды
         """
-        opcode = cmd['opcode']
-        operands = cmd['operands']
+        value, size = self._pack_fields(cmd)
         
-        # Получаем маски для битовых полей
-        masks = UVMSpec.get_field_masks(opcode)
+        # Конвертируем в байты (little-endian)
+        return value.to_bytes(size, byteorder='little')
+    
+    def encode_program(self, intermediate_repr, keep_listing=False):
+        """
+        Кодирует всю программу в машинный код.
         
-        # Собираем битовое представление
-        value = 0
+        Буфер выделяется один раз под всю программу, команды записываются
+        в него на месте без промежуточных объектов bytes.
         
-        # Поле A (опкод)
-        mask_a, shift_a = masks['A']
-        value |= (opcode & mask_a) << shift_a
+        Args:
+            intermediate_repr: Промежуточное представление программы
+            keep_listing: Сохранить листинг команд для print_encoded_commands
+            
+        Returns:
+            bytearray: Бинарное представление программы
+        """
+        opcodes, operands_b, operands_c = self._columns(intermediate_repr)
+        words, sizes = _pack_words(opcodes, operands_b, operands_c)
         
-        # Поле B
-        mask_b, shift_b = masks['B']
-        value |= (operands['B'] & mask_b) << shift_b
+        self.encoded_commands = []
+        self._line_table = []
         
-        # Поле C
-        mask_c, shift_c = masks['C']
-        value |= (operands['C'] & mask_c) << shift_c
+        # Все команды УВМ - 32-битные слова: собираем программу в массив
+        # машинных слов и копируем его в binary_data одним memcpy
+        packed_whole = all(size == _WORD.size for size in sizes)
+        if packed_whole:
+            word_array = array(_WORD_TYPECODE, words)
+            if sys.byteorder == 'big':
+                word_array.byteswap()
+            self.binary_data = bytearray(word_array)
+        else:
+            self.binary_data = bytearray(sum(sizes))
         
-        # Определяем размер команды в байтах
-        size = UVMSpec.COMMAND_SIZES.get(opcode, 4)
+        offset = 0
+        for pos, (value, size) in enumerate(zip(words, sizes)):
+            if not packed_whole:
+                self._store_value(value, size, offset)
+            
+            src_key = _command_key(opcodes[pos], operands_b[pos], operands_c[pos])
+            self._line_table.append(LineEntry(src_key, offset, size))
+            
+            if keep_listing:
+                self.encoded_commands.append(
+                    self._listing_entry(intermediate_repr[pos], offset, size)
+                )
+            
+            offset += size
         
-        # Конвертируем в байты (little-endian)
-        return value.to_bytes(size, byteorder='little')
+        self.dirty_count = len(self._line_table)
+        return self.binary_data
     
-    def encode_program(self, intermediate_repr):
+    def encode_incremental(self, intermediate_repr, changed_lines=None):
         """
-        Кодирует всю программу в машинный код.
+        Перекодирует только изменившиеся команды программы.
+        
+        Все команды УВМ имеют фиксированный размер, поэтому измененная
+        команда заменяется в бинарных данных на месте. При изменении
+        количества команд или их размеров выполняется полное кодирование.
         
         Args:
             intermediate_repr: Промежуточное представление программы
+            changed_lines: Номера команд (cmd.index) для проверки,
+                None - проверить все команды
             
         Returns:
             bytearray: Бинарное представление программы
         """
-        self.binary_data = bytearray()
-        self.encoded_commands = []
+        keep_listing = bool(self.encoded_commands)
+        
+        if len(intermediate_repr) != len(self._line_table):
+            return self.encode_program(intermediate_repr, keep_listing)
+        
+        if changed_lines is None:
+            positions = range(len(intermediate_repr))
+        else:
+            positions = sorted(i - 1 for i in set(changed_lines)
+                               if 1 <= i <= len(intermediate_repr))
         
-        for cmd in intermediate_repr:
-            encoded = self.encode_command(cmd)
-            self.encoded_commands.append({
-                'command': cmd,
-                'bytes': encoded,
-                'hex_str': UVMSpec.bytes_to_hex(encoded)
-            })
-            self.binary_data.extend(encoded)
+        self.dirty_count = 0
+        for pos in positions:
+            cmd = intermediate_repr[pos]
+            entry = self._line_table[pos]
+            src_key = _command_key(cmd.opcode, cmd.B, cmd.C)
+            if src_key == entry.src_key:
+                continue
+            
+            if _get_format(cmd.opcode)[1] != entry.size:
+                # Структурное изменение: смещения всех следующих команд сдвигаются
+                return self.encode_program(intermediate_repr, keep_listing)
+            
+            offset = entry.byte_offset
+            self._write_command(cmd, offset)
+            self._line_table[pos] = LineEntry(src_key, offset, entry.size)
+            if keep_listing:
+                self.encoded_commands[pos] = self._listing_entry(cmd, offset, entry.size)
+            self.dirty_count += 1
         
         return self.binary_data
     
@@ -82,8 +267,27 @@ class CommandEncoder:
         Args:
             output_path: Путь к выходному файлу
         """
-        with open(output_path, 'wb') as f:
-            f.write(self.binary_data)
+        size = len(self.binary_data)
+        
+        # Пишем напрямую в файловый дескриптор, минуя буферизацию io
+        # (O_BINARY нужен на Windows, иначе байты 0x0A превращаются в 0x0D 0x0A).
+        # O_RDWR требуется для отображения файла в память
+        flags = os.O_RDWR | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+        fd = os.open(output_path, flags, 0o644)
+        try:
+            if size > _MMAP_THRESHOLD:
+                # Большие программы копируются сразу в страницы файла
+                os.ftruncate(fd, size)
+                with mmap.mmap(fd, size) as mm:
+                    mm[:] = self.binary_data
+                    mm.flush()
+            else:
+                view = memoryview(self.binary_data)
+                while view:
+                    written = os.write(fd, view)
+                    view = view[written:]
+        finally:
+            os.close(fd)
     
     def print_encoded_commands(self):
         """Выводит закодированные команды в hex формате."""
@@ -93,21 +297,37 @@ class CommandEncoder:
         
         for i, enc in enumerate(self.encoded_commands, 1):
             cmd = enc['command']
-            print(f"\nКоманда {i}: {UVMSpec.OPCODE_NAMES.get(cmd['opcode'], 'UNKNOWN')}")
-            print(f"  Исходная: {cmd['description']}")
-            print(f"  Байты: {enc['hex_str']}")
+            print(f"\nКоманда {i}: {UVMSpec.OPCODE_NAMES.get(cmd.opcode, 'UNKNOWN')}")
+            print(f"  Исходная: {cmd.description}")
+            print(f"  Байты: {UVMSpec.bytes_to_hex(enc['bytes'])}")
     
-    def get_statistics(self, output_path):
+    def get_statistics(self, output_path, verify=False):
         """
         Возвращает статистику по ассемблированной программе.
         
+        Размер файла берется из длины записанных данных; обращение
+        к файловой системе выполняется только при verify=True.
+        
+        Args:
+            output_path: Путь к выходному файлу
+            verify: Сверить размер записанного файла с данными
+            
         Returns:
             dict: Статистика программы
+            
+        Raises:
+            OSError: Если размер файла не совпадает с размером данных
         """
-        file_size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+        file_size = len(self.binary_data)
+        
+        if verify:
+            actual_size = os.path.getsize(output_path)
+            if actual_size != file_size:
+                raise OSError(f"Размер файла {output_path} ({actual_size} байт) "
+                              f"не совпадает с размером данных ({file_size} байт)")
         
         return {
-            'command_count': len(self.encoded_commands),
+            'command_count': len(self._line_table),
             'total_bytes': len(self.binary_data),
             'file_size': file_size,
             'output_file': output_path
@@ -3,47 +3,285 @@
 """
 
 import argparse
+import functools
 import struct
 import sys
 import os
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+from array import array
+from collections import Counter
+from collections.abc import MutableMapping
 
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from cli import split_path_pair
 from spec import UVMSpec
 
+
+# Расположение операндов по опкоду: (сдвиг B, маска B, сдвиг C, маска C).
+# Формат команды выбирается поиском в таблице, без ветвления по опкоду
+_OPERAND_LAYOUT = {
+    opcode: (masks['B'][1], masks['B'][0], masks['C'][1], masks['C'][0])
+    for opcode, masks in ((op, UVMSpec.get_field_masks(op)) for op in UVMSpec.OPCODE_NAMES)
+}
+
+# Формат по умолчанию (регистр-регистр) для опкодов вне спецификации
+_DEFAULT_LAYOUT = (UVMSpec.RF_B_SHIFT, UVMSpec.RF_REG_MASK,
+                   UVMSpec.RF_C_SHIFT, UVMSpec.RF_REG_MASK)
+
+# Индексы ячеек блока состояния UVMMemory._state
+_PC, _HALTED, _EXECUTED, _READS, _WRITES = range(5)
+_STATE_SIZE = 5
+
+# Ключи статистики выполнения -> ячейки блока состояния
+_STATS_FIELDS = {
+    'instructions_executed': _EXECUTED,
+    'memory_reads': _READS,
+    'memory_writes': _WRITES
+}
+
+
+class _StatsView(MutableMapping):
+    """
+    Словарь статистики выполнения поверх блока состояния UVMMemory._state.
+    
+    Чтение и запись идут прямо в ячейки блока состояния, поэтому
+    stats['memory_reads'] += 1 изменяет счетчик интерпретатора.
+    Набор ключей фиксирован.
+    """
+    
+    def __init__(self, state):
+        self._state = state
+    
+    def __getitem__(self, key):
+        return self._state[_STATS_FIELDS[key]]
+    
+    def __setitem__(self, key, value):
+        self._state[_STATS_FIELDS[key]] = value
+    
+    def __delitem__(self, key):
+        raise TypeError("Ключи статистики выполнения нельзя удалять")
+    
+    def __iter__(self):
+        return iter(_STATS_FIELDS)
+    
+    def __len__(self):
+        return len(_STATS_FIELDS)
+    
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def _dirty_indices(values, dirty, start=0, end=None):
+    """
+    Возвращает отсортированные индексы ненулевых элементов в диапазоне [start, end).
+    
+    Просматриваются только индексы из множества dirty (ячейки, в которые
+    выполнялась запись), а не весь массив.
+    """
+    if end is None:
+        end = len(values)
+    return sorted(i for i in dirty if start <= i < end and values[i])
+
+
+# Исходный код цикла выборки-исполнения без трассировки. Семантика
+# совпадает с последовательными вызовами UVMMemory.step(), но все состояние
+# хранится в локальных переменных. Ветви диспетчера ({branches})
+# подставляются под конкретную программу, см. _compile_run_core
+_RUN_CORE_SOURCE = '''
+def run_core(code_size, ops, operands_b, operands_c, registers, data_memory, data_dirty, pc, max_steps):
+    count = len(ops)
+    data_size = len(data_memory)
+    
+    executed = reads = writes = 0
+    while executed < max_steps:
+        idx = pc >> 2
+        if idx >= count:
+            if pc < code_size:
+                remaining = code_size - pc
+                return (code_size, executed, reads, writes, True,
+                        f"❌ Ошибка декодирования: Инструкция должна быть 4 байта, получено {{remaining}}")
+            return pc, executed, reads, writes, True, None
+        
+        opcode = ops[idx]
+        b = operands_b[idx]
+        c = operands_c[idx]
+        pc += 4
+        
+{branches}
+        else:
+            return (pc, executed, reads, writes, True,
+                    f"❌ Ошибка декодирования: Некорректная инструкция: Неизвестный опкод: {{opcode}}")
+        
+        executed += 1
+    
+    return pc, executed, reads, writes, False, None
+'''
+
+# Тела ветвей диспетчера для каждого опкода
+_BRANCH_SOURCE = {
+    UVMSpec.LOAD_CONST: '''
+            registers[c] = b''',
+    UVMSpec.READ_MEM: '''
+            mem_addr = registers[c]
+            if not 0 <= mem_addr < data_size:
+                return (pc, executed, reads, writes, True,
+                        f"❌ Ошибка выполнения: Адрес памяти вне диапазона: {mem_addr}")
+            registers[b] = data_memory[mem_addr]
+            reads += 1''',
+    UVMSpec.WRITE_MEM: '''
+            mem_addr = registers[b]
+            if not 0 <= mem_addr < data_size:
+                return (pc, executed, reads, writes, True,
+                        f"❌ Ошибка выполнения: Адрес памяти вне диапазона: {mem_addr}")
+            data_memory[mem_addr] = registers[c]
+            data_dirty.add(mem_addr)
+            writes += 1''',
+    UVMSpec.ABS: '''
+            pass  # ABS будет реализован в этапе 4, пока NOP'''
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_run_core(opcodes):
+    """
+    Генерирует цикл выборки-исполнения, специализированный под программу.
+    
+    В диспетчер попадают только ветви переданных опкодов в заданном порядке
+    (самые частые - первыми), опкоды подставляются литералами. Остальные
+    опкоды обрабатываются как неизвестные.
+    
+    Args:
+        opcodes: Кортеж опкодов в порядке проверки
+        
+    Returns:
+        function: run_core(code_size, ops, operands_b, operands_c, registers,
+                           data_memory, data_dirty, pc, max_steps) ->
+                  (pc, выполнено инструкций, чтений, записей, halted, ошибка или None)
+    """
+    branches = []
+    for opcode in opcodes:
+        keyword = 'elif' if branches else 'if'
+        branches.append(f"        {keyword} opcode == {opcode}:{_BRANCH_SOURCE[opcode]}")
+    if not branches:
+        branches.append("        if False:\n            pass")
+    
+    namespace = {}
+    source = _RUN_CORE_SOURCE.format(branches="\n".join(branches))
+    exec(compile(source, f"<run_core {opcodes}>", 'exec'), namespace)
+    return namespace['run_core']
+
+
+# Цикл для произвольной программы: все опкоды спецификации
+_run_core = _compile_run_core(tuple(UVMSpec.OPCODE_NAMES))
+
+
 class UVMMemory:
     """Модель памяти УВМ с разделением памяти команд и данных."""
     
-    def __init__(self, data_size=1024, reg_count=32):
+    def __init__(self, data_size=1024, reg_count=32, verbose=False):
         """
         Инициализация памяти УВМ.
         
         Args:
             data_size: Размер памяти данных (в словах)
             reg_count: Количество регистров
+            verbose: Выводить трассировку выполнения по шагам
         """
         # Память команд (хранит бинарный код программы)
         self.code_memory = bytearray()
         
-        # Память данных (32-битные слова)
-        self.data_memory = [0] * data_size
+        # Память данных (32-битные слова в непрерывном массиве)
+        self._data_memory = array('i', bytes(4 * data_size))
         
         # Регистры (32-битные)
-        self.registers = [0] * reg_count
-        
-        # Счетчик команд
-        self.pc = 0
+        self._registers = array('i', bytes(4 * reg_count))
+        
+        # Индексы регистров и ячеек памяти, в которые выполнялась запись:
+        # дамп и вывод состояния просматривают только их. Поэтому снаружи
+        # память и регистры доступны только на чтение, а запись идет
+        # через write_memory/write_register
+        self._reg_dirty = set()
+        self._data_dirty = set()
+        
+        # Блок состояния: счетчик команд, флаг завершения и статистика
+        # выполнения лежат рядом в одном массиве 64-битных целых
+        self._state = array('q', bytes(8 * _STATE_SIZE))
+        
+        # Трассировка выполнения: копится в журнале и выводится одним print
+        self.verbose = verbose
+        self._log = []
+        
+        # Предекодированная программа (структура массивов): опкоды и
+        # операнды B, C каждой инструкции, индекс = PC // 4
+        self._op = array('i')
+        self._B = array('i')
+        self._C = array('i')
+        
+        # Цикл выполнения без трассировки (специализируется при загрузке)
+        self._run_core = _run_core
+        
+        # Таблица переходов: опкод -> обработчик команды
+        self._dispatch = {
+            UVMSpec.LOAD_CONST: self.execute_load_const,
+            UVMSpec.READ_MEM: self.execute_read_mem,
+            UVMSpec.WRITE_MEM: self.execute_write_mem,
+            UVMSpec.ABS: self.execute_abs
+        }
+    
+    @property
+    def pc(self):
+        """Счетчик команд."""
+        return self._state[_PC]
+    
+    @pc.setter
+    def pc(self, value):
+        self._state[_PC] = value
+    
+    @property
+    def halted(self):
+        """Флаг завершения программы."""
+        return bool(self._state[_HALTED])
+    
+    @halted.setter
+    def halted(self, value):
+        self._state[_HALTED] = bool(value)
+    
+    @property
+    def stats(self):
+        """Статистика выполнения (изменяемое представление блока состояния)."""
+        return _StatsView(self._state)
+    
+    @property
+    def data_memory(self):
+        """Память данных (только чтение; запись - через write_memory)."""
+        return memoryview(self._data_memory).toreadonly()
+    
+    @property
+    def registers(self):
+        """Регистры (только чтение; запись - через write_register)."""
+        return memoryview(self._registers).toreadonly()
+    
+    def write_memory(self, addr, value):
+        """
+        Записывает значение в ячейку памяти данных.
         
-        # Флаг завершения программы
-        self.halted = False
+        Raises:
+            IndexError: Если адрес вне памяти данных
+        """
+        if not 0 <= addr < len(self._data_memory):
+            raise IndexError(f"Адрес памяти вне диапазона: {addr}")
+        self._data_memory[addr] = value
+        self._data_dirty.add(addr)
+    
+    def write_register(self, reg_addr, value):
+        """
+        Записывает значение в регистр.
         
-        # Статистика выполнения
-        self.stats = {
-            'instructions_executed': 0,
-            'memory_reads': 0,
-            'memory_writes': 0
-        }
+        Raises:
+            IndexError: Если номер регистра вне диапазона
+        """
+        if not 0 <= reg_addr < len(self._registers):
+            raise IndexError(f"Номер регистра вне диапазона: {reg_addr}")
+        self._registers[reg_addr] = value
+        self._reg_dirty.add(reg_addr)
     
     def load_program(self, binary_path):
         """
@@ -54,10 +292,35 @@ class UVMMemory:
             
         Raises:
             FileNotFoundError: Если файл не найден
+            ValueError: Если программа содержит неизвестные опкоды
         """
         try:
-            with open(binary_path, 'rb') as f:
-                self.code_memory = bytearray(f.read())
+            # Файл читается сразу в заранее выделенный буфер, без
+            # промежуточного объекта bytes и его копирования в bytearray
+            with open(binary_path, 'rb', buffering=0) as f:
+                size = os.fstat(f.fileno()).st_size
+                self.code_memory = bytearray(size)
+                view = memoryview(self.code_memory)
+                loaded = 0
+                while loaded < size:
+                    read = f.readinto(view[loaded:])
+                    if not read:
+                        break
+                    loaded += read
+                view.release()
+                if loaded < size:
+                    del self.code_memory[loaded:]
+            
+            self._predecode()
+            self._validate_program()
+            
+            # Диспетчер содержит только опкоды программы, частые - первыми
+            order = tuple(opcode for opcode, _ in Counter(self._op).most_common())
+            self._run_core = _compile_run_core(order)
+            
+            # Быстрый цикл не отслеживает запись в регистры: их набор
+            # известен заранее по операндам-приемникам команд программы
+            self._reg_dirty.update(self._written_registers())
             
             print(f"✓ Программа загружена: {len(self.code_memory)} байт")
             
@@ -68,180 +331,164 @@ class UVMMemory:
         except FileNotFoundError:
             raise FileNotFoundError(f"Файл программы не найден: {binary_path}")
     
-    def read_instruction(self):
+    def _predecode(self):
         """
-        Читает следующую инструкцию из памяти команд.
+        Декодирует всю память команд в массивы опкодов и операндов.
         
-        Returns:
-            bytes: 4 байта инструкции или None если конец программы
-            
-        Raises:
-            IndexError: Если вышли за пределы памяти
+        Выполняется один раз при загрузке: память команд во время работы
+        не изменяется. Неполное слово в конце программы не декодируется.
+        Опкоды проверяются отдельно, см. _validate_program.
         """
-        if self.pc >= len(self.code_memory):
-            self.halted = True
-            return None
-        
-        if self.pc + 4 > len(self.code_memory):
-            # Читаем оставшиеся байты
-            instruction = self.code_memory[self.pc:]
-            self.pc = len(self.code_memory)
-        else:
-            instruction = self.code_memory[self.pc:self.pc + 4]
-            self.pc += 4
-        
-        return instruction
+        count = len(self.code_memory) // 4
+        words = struct.unpack_from(f'<{count}I', self.code_memory)
+        
+        # Формат операндов каждой команды берется из таблицы _OPERAND_LAYOUT,
+        # каждое поле извлекается одним проходом по всем словам программы
+        self._op = array('i', [w & UVMSpec.OP_MASK for w in words])
+        layouts = [_OPERAND_LAYOUT.get(op, _DEFAULT_LAYOUT) for op in self._op]
+        self._B = array('i', [(w >> shift_b) & mask_b
+                              for w, (shift_b, mask_b, _, _) in zip(words, layouts)])
+        self._C = array('i', [(w >> shift_c) & mask_c
+                              for w, (_, _, shift_c, mask_c) in zip(words, layouts)])
     
-    def decode_instruction(self, instruction_bytes):
+    def _written_registers(self):
+        """Возвращает регистры-приемники команд загруженной программы."""
+        load_const = UVMSpec.LOAD_CONST
+        read_mem = UVMSpec.READ_MEM
+        return ({c for op, c in zip(self._op, self._C) if op == load_const}
+                | {b for op, b in zip(self._op, self._B) if op == read_mem})
+    
+    def _validate_program(self):
         """
-        Декодирует бинарную инструкцию в промежуточное представление.
+        Проверяет опкоды всей программы один раз при загрузке.
+        
+        Операнды проверять не нужно: маски полей ограничивают их
+        разрядностью. Поэтому при выполнении инструкции не валидируются.
         
-        Args:
-            instruction_bytes: 4 байта инструкции
-            
-        Returns:
-            dict: Декодированная команда
-            
         Raises:
-            ValueError: Если инструкция некорректна
+            ValueError: Если программа содержит неизвестные опкоды
         """
-        if len(instruction_bytes) != 4:
-            raise ValueError(f"Инструкция должна быть 4 байта, получено {len(instruction_bytes)}")
-        
-        # Конвертируем в целое число (little-endian)
-        instruction = int.from_bytes(instruction_bytes, byteorder='little')
-        
-        # Извлекаем опкод (биты 0-5)
-        opcode = (instruction >> 0) & 0x3F
-        
-        # Определяем формат команды и извлекаем операнды
-        if opcode == UVMSpec.LOAD_CONST:
-            # Формат LOAD_CONST: A=опкод, B=константа (20 бит), C=адрес (5 бит)
-            B = (instruction >> 6) & 0xFFFFF  # 20 бит
-            C = (instruction >> 26) & 0x1F    # 5 бит
-        else:
-            # Формат остальных команд: A=опкод, B=адрес (5 бит), C=адрес (5 бит)
-            B = (instruction >> 6) & 0x1F    # 5 бит
-            C = (instruction >> 11) & 0x1F   # 5 бит
-        
-        # Создаем промежуточное представление
-        decoded = {
-            'opcode': opcode,
-            'operands': {
-                'B': B,
-                'C': C
-            },
-            'description': UVMSpec.get_command_description(opcode, {'B': B, 'C': C}),
-            'bytes': instruction_bytes
-        }
-        
-        # Валидируем команду
-        try:
-            UVMSpec.validate_command(opcode, {'B': B, 'C': C})
-        except ValueError as e:
-            raise ValueError(f"Некорректная инструкция: {e}")
-        
-        return decoded
+        # Множество опкодов строится на уровне C; позиции ищутся,
+        # только если среди них есть неизвестные
+        if set(self._op) <= UVMSpec.OPCODE_NAMES.keys():
+            return
+        
+        invalid = [
+            f"{opcode} (PC={idx * 4})"
+            for idx, opcode in enumerate(self._op)
+            if opcode not in UVMSpec.OPCODE_NAMES
+        ]
+        raise ValueError(f"Некорректная программа: неизвестные опкоды: {', '.join(invalid)}")
+    
+    def flush_log(self):
+        """Выводит накопленную трассировку одним вызовом print."""
+        if self._log:
+            print("\n".join(self._log))
+            self._log = []
     
-    def execute_load_const(self, operands):
+    def _error(self, message):
+        """Выводит сообщение об ошибке после уже накопленной трассировки."""
+        self.flush_log()
+        print(message)
+    
+    def execute_load_const(self, b, c):
         """
         Выполняет команду LOAD_CONST.
         
         Args:
-            operands: Словарь с операндами {'B': константа, 'C': адрес_регистра}
+            b: Константа
+            c: Адрес регистра
         """
-        const_value = operands['B']
-        reg_addr = operands['C']
+        const_value = b
+        reg_addr = c
         
         # Загружаем константу в регистр
-        self.registers[reg_addr] = const_value
+        self._registers[reg_addr] = const_value
+        self._reg_dirty.add(reg_addr)
         
-        print(f"  R{reg_addr} = {const_value} (0x{const_value:X})")
+        if self.verbose:
+            self._log.append(f"  R{reg_addr} = {const_value} (0x{const_value:X})")
     
-    def execute_read_mem(self, operands):
+    def execute_read_mem(self, b, c):
         """
         Выполняет команду READ_MEM.
         
         Args:
-            operands: Словарь с операндами {'B': адрес_регистра_назначения, 
-                                           'C': адрес_регистра_источника}
+            b: Адрес регистра-назначения
+            c: Адрес регистра-источника (адрес в памяти данных)
         """
-        dest_reg = operands['B']
-        src_reg = operands['C']
+        dest_reg = b
+        src_reg = c
         
         # Получаем адрес в памяти данных из регистра-источника
-        mem_addr = self.registers[src_reg]
+        mem_addr = self._registers[src_reg]
         
         # Проверяем границы памяти
-        if 0 <= mem_addr < len(self.data_memory):
+        if 0 <= mem_addr < len(self._data_memory):
             # Читаем значение из памяти данных
-            value = self.data_memory[mem_addr]
+            value = self._data_memory[mem_addr]
             
             # Записываем в регистр-назначение
-            self.registers[dest_reg] = value
+            self._registers[dest_reg] = value
+            self._reg_dirty.add(dest_reg)
             
-            self.stats['memory_reads'] += 1
+            self._state[_READS] += 1
             
-            print(f"  R{dest_reg} = M[R{src_reg}={mem_addr}] = {value}")
+            if self.verbose:
+                self._log.append(f"  R{dest_reg} = M[R{src_reg}={mem_addr}] = {value}")
         else:
             raise IndexError(f"Адрес памяти вне диапазона: {mem_addr}")
     
-    def execute_write_mem(self, operands):
+    def execute_write_mem(self, b, c):
         """
         Выполняет команду WRITE_MEM.
         
         Args:
-            operands: Словарь с операндами {'B': адрес_регистра_памяти, 
-                                           'C': адрес_регистра_источника}
+            b: Адрес регистра памяти
+            c: Адрес регистра-источника
         """
-        mem_reg = operands['B']
-        src_reg = operands['C']
+        mem_reg = b
+        src_reg = c
         
         # Получаем адрес в памяти данных из регистра памяти
-        mem_addr = self.registers[mem_reg]
+        mem_addr = self._registers[mem_reg]
         
         # Получаем значение из регистра-источника
-        value = self.registers[src_reg]
+        value = self._registers[src_reg]
         
         # Проверяем границы памяти
-        if 0 <= mem_addr < len(self.data_memory):
+        if 0 <= mem_addr < len(self._data_memory):
             # Записываем значение в память данных
-            self.data_memory[mem_addr] = value
+            self._data_memory[mem_addr] = value
+            self._data_dirty.add(mem_addr)
             
-            self.stats['memory_writes'] += 1
+            self._state[_WRITES] += 1
             
-            print(f"  M[R{mem_reg}={mem_addr}] = R{src_reg} = {value}")
+            if self.verbose:
+                self._log.append(f"  M[R{mem_reg}={mem_addr}] = R{src_reg} = {value}")
         else:
             raise IndexError(f"Адрес памяти вне диапазона: {mem_addr}")
     
-    def execute_instruction(self, decoded):
+    def execute_abs(self, b, c):
         """
-        Выполняет декодированную инструкцию.
+        Выполняет команду ABS.
+        
+        ABS будет реализован в этапе 4, пока выполняется как NOP.
+        """
+        if self.verbose:
+            self._log.append(f"  ⚠ Команда ABS пока не реализована (этап 4)")
+    
+    def _execute(self, opcode, b, c):
+        """
+        Выполняет инструкцию по опкоду и операндам.
         
-        Args:
-            decoded: Декодированная команда
-            
         Raises:
             ValueError: Если опкод неизвестен
         """
-        opcode = decoded['opcode']
-        operands = decoded['operands']
-        
-        print(f"  Выполнение: {decoded['description']}")
-        
-        if opcode == UVMSpec.LOAD_CONST:
-            self.execute_load_const(operands)
-        elif opcode == UVMSpec.READ_MEM:
-            self.execute_read_mem(operands)
-        elif opcode == UVMSpec.WRITE_MEM:
-            self.execute_write_mem(operands)
-        elif opcode == UVMSpec.ABS:
-            # ABS будет реализован в этапе 4
-            print(f"  ⚠ Команда ABS пока не реализована (этап 4)")
-            # Временно выполняем как NOP
-            pass
-        else:
+        handler = self._dispatch.get(opcode)
+        if handler is None:
             raise ValueError(f"Неизвестный опкод: {opcode}")
+        handler(b, c)
     
     def step(self):
         """
@@ -253,27 +500,32 @@ class UVMMemory:
         if self.halted:
             return False
         
-        # Читаем инструкцию
-        instruction_bytes = self.read_instruction()
+        idx = self.pc >> 2
         
-        if instruction_bytes is None:
+        if idx >= len(self._op):
+            # Конец программы или неполная инструкция в хвосте файла
+            remaining = len(self.code_memory) - self.pc
+            if remaining > 0:
+                self.pc = len(self.code_memory)
+                self._error(f"❌ Ошибка декодирования: Инструкция должна быть 4 байта, получено {remaining}")
             self.halted = True
             return False
         
-        # Декодируем инструкцию
-        try:
-            decoded = self.decode_instruction(instruction_bytes)
-        except ValueError as e:
-            print(f"❌ Ошибка декодирования: {e}")
-            self.halted = True
-            return False
+        # Инструкция уже декодирована при загрузке программы
+        opcode = self._op[idx]
+        b = self._B[idx]
+        c = self._C[idx]
+        self.pc += 4
         
         # Выполняем инструкцию
         try:
-            self.execute_instruction(decoded)
-            self.stats['instructions_executed'] += 1
+            if self.verbose:
+                description = UVMSpec.get_command_description(opcode, b, c)
+                self._log.append(f"  Выполнение: {description}")
+            self._execute(opcode, b, c)
+            self._state[_EXECUTED] += 1
         except (ValueError, IndexError) as e:
-            print(f"❌ Ошибка выполнения: {e}")
+            self._error(f"❌ Ошибка выполнения: {e}")
             self.halted = True
             return False
         
@@ -293,14 +545,31 @@ class UVMMemory:
         print("ЗАПУСК ИНТЕРПРЕТАТОРА УВМ")
         print(f"{'='*60}")
         
-        step_count = 0
-        while not self.halted and step_count < max_steps:
-            print(f"\nШаг {step_count + 1} (PC={self.pc}):")
-            
-            if not self.step():
-                break
+        if self.verbose:
+            step_count = 0
+            while not self.halted and step_count < max_steps:
+                self._log.append(f"\nШаг {step_count + 1} (PC={self.pc}):")
+                
+                if not self.step():
+                    break
+                
+                step_count += 1
             
-            step_count += 1
+            self.flush_log()
+        elif self.halted:
+            step_count = 0
+        else:
+            # Без трассировки весь цикл выполняется в одной функции
+            # на локальных переменных
+            self.pc, step_count, reads, writes, self.halted, error = self._run_core(
+                len(self.code_memory), self._op, self._B, self._C,
+                self._registers, self._data_memory, self._data_dirty, self.pc, max_steps
+            )
+            self._state[_EXECUTED] += step_count
+            self._state[_READS] += reads
+            self._state[_WRITES] += writes
+            if error:
+                self._error(error)
         
         if self.halted:
             print(f"\n✓ Программа завершена")
@@ -322,47 +591,50 @@ class UVMMemory:
             str: Строка XML дампа
         """
         if end_addr is None:
-            end_addr = min(len(self.data_memory), start_addr + 100)  # Ограничиваем дамп
+            end_addr = min(len(self._data_memory), start_addr + 100)  # Ограничиваем дамп
         
-        # Создаем корневой элемент
-        root = ET.Element("uvm_memory_dump")
+        # Документ собирается за один проход в формате minidom.toprettyxml:
+        # отступ 2 пробела, пустые элементы самозакрывающиеся
+        lines = ['<?xml version="1.0" ?>', '<uvm_memory_dump>']
         
         # Добавляем информацию о программе
-        info = ET.SubElement(root, "program_info")
-        ET.SubElement(info, "instructions_executed").text = str(self.stats['instructions_executed'])
-        ET.SubElement(info, "memory_reads").text = str(self.stats['memory_reads'])
-        ET.SubElement(info, "memory_writes").text = str(self.stats['memory_writes'])
-        ET.SubElement(info, "program_counter").text = str(self.pc)
-        
-        # Добавляем регистры
-        registers_elem = ET.SubElement(root, "registers")
-        for i, value in enumerate(self.registers):
-            if value != 0:  # Сохраняем только ненулевые регистры
-                reg_elem = ET.SubElement(registers_elem, "register")
-                reg_elem.set("id", str(i))
-                reg_elem.set("value", str(value))
-                reg_elem.set("hex", f"0x{value:X}")
-        
-        # Добавляем память данных
-        memory_elem = ET.SubElement(root, "data_memory")
-        memory_elem.set("start_address", str(start_addr))
-        memory_elem.set("end_address", str(end_addr))
-        memory_elem.set("total_size", str(len(self.data_memory)))
-        
-        for addr in range(start_addr, min(end_addr, len(self.data_memory))):
-            value = self.data_memory[addr]
-            if value != 0:  # Сохраняем только ненулевые ячейки
-                cell_elem = ET.SubElement(memory_elem, "memory_cell")
-                cell_elem.set("address", str(addr))
-                cell_elem.set("value", str(value))
-                cell_elem.set("hex", f"0x{value:X}")
-        
-        # Форматируем XML
-        xml_str = ET.tostring(root, encoding='unicode')
-        
-        # Используем minidom для красивого форматирования
-        dom = minidom.parseString(xml_str)
-        pretty_xml = dom.toprettyxml(indent="  ")
+        lines.append('  <program_info>')
+        state = self._state
+        lines.append(f"    <instructions_executed>{state[_EXECUTED]}</instructions_executed>")
+        lines.append(f"    <memory_reads>{state[_READS]}</memory_reads>")
+        lines.append(f"    <memory_writes>{state[_WRITES]}</memory_writes>")
+        lines.append(f"    <program_counter>{state[_PC]}</program_counter>")
+        lines.append('  </program_info>')
+        
+        # Добавляем регистры (только ненулевые)
+        registers = [
+            f'    <register id="{i}" value="{self._registers[i]}" hex="0x{self._registers[i]:X}"/>'
+            for i in _dirty_indices(self._registers, self._reg_dirty)
+        ]
+        if registers:
+            lines.append('  <registers>')
+            lines.extend(registers)
+            lines.append('  </registers>')
+        else:
+            lines.append('  <registers/>')
+        
+        # Добавляем память данных (только ненулевые ячейки)
+        memory_attrs = (f'start_address="{start_addr}" end_address="{end_addr}" '
+                        f'total_size="{len(self._data_memory)}"')
+        cells = [
+            f'    <memory_cell address="{addr}" value="{self._data_memory[addr]}" '
+            f'hex="0x{self._data_memory[addr]:X}"/>'
+            for addr in _dirty_indices(self._data_memory, self._data_dirty, start_addr, end_addr)
+        ]
+        if cells:
+            lines.append(f'  <data_memory {memory_attrs}>')
+            lines.extend(cells)
+            lines.append('  </data_memory>')
+        else:
+            lines.append(f'  <data_memory {memory_attrs}/>')
+        
+        lines.append('</uvm_memory_dump>')
+        pretty_xml = "\n".join(lines) + "\n"
         
         # Сохраняем в файл
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -373,31 +645,36 @@ class UVMMemory:
         return pretty_xml
     
     def print_status(self):
-        """Выводит текущее состояние памяти и регистров."""
-        print(f"\n{'='*60}")
-        print("СОСТОЯНИЕ УВМ:")
-        print(f"{'='*60}")
+        """Выводит текущее состояние памяти и регистров (одним print)."""
+        registers = self._registers
+        data_memory = self._data_memory
+        state = self._state
+        
+        lines = [f"\n{'='*60}", "СОСТОЯНИЕ УВМ:", f"{'='*60}"]
         
         # Регистры
-        print("\n📊 Регистры (ненулевые):")
-        for i, value in enumerate(self.registers):
-            if value != 0:
-                print(f"  R{i:2d} = {value:10d} (0x{value:08X})")
+        lines.append("\n📊 Регистры (ненулевые):")
+        lines.extend(
+            f"  R{i:2d} = {registers[i]:10d} (0x{registers[i]:08X})"
+            for i in _dirty_indices(registers, self._reg_dirty)
+        )
         
         # Память данных (первые 16 ячеек)
-        print("\n💾 Память данных (первые 16 ячеек):")
-        for i in range(0, min(16, len(self.data_memory))):
-            value = self.data_memory[i]
-            if value != 0:
-                print(f"  M[{i:3d}] = {value:10d} (0x{value:08X})")
+        lines.append("\n💾 Память данных (первые 16 ячеек):")
+        lines.extend(
+            f"  M[{i:3d}] = {data_memory[i]:10d} (0x{data_memory[i]:08X})"
+            for i in _dirty_indices(data_memory, self._data_dirty, 0, 16)
+        )
         
         # Статистика
-        print(f"\n📈 Статистика выполнения:")
-        print(f"  • Выполнено инструкций: {self.stats['instructions_executed']}")
-        print(f"  • Чтений из памяти: {self.stats['memory_reads']}")
-        print(f"  • Записей в память: {self.stats['memory_writes']}")
-        print(f"  • Счетчик команд (PC): {self.pc}")
-        print(f"{'='*60}")
+        lines.append(f"\n📈 Статистика выполнения:")
+        lines.append(f"  • Выполнено инструкций: {state[_EXECUTED]}")
+        lines.append(f"  • Чтений из памяти: {state[_READS]}")
+        lines.append(f"  • Записей в память: {state[_WRITES]}")
+        lines.append(f"  • Счетчик команд (PC): {state[_PC]}")
+        lines.append(f"{'='*60}")
+        
+        print("\n".join(lines))
 
 
 class InterpreterCLI:
@@ -419,6 +696,8 @@ class InterpreterCLI:
         print(f"{'='*60}")
         
         try:
+            self.memory.verbose = args.verbose
+            
             # Загружаем программу
             self.memory.load_program(args.binary_file)
             
@@ -443,14 +722,15 @@ class InterpreterCLI:
             print(f"\n✅ ВЫПОЛНЕНИЕ ПРОГРАММЫ ЗАВЕРШЕНО")
             
         except Exception as e:
-            print(f"❌ Ошибка: {e}")
+            print(f"❌ Ошибка: {e}", file=sys.stderr)
             import traceback
             traceback.print_exc()
             sys.exit(1)
 
 
-def main():
-    """Точка входа в интерпретатор."""
+@functools.lru_cache(maxsize=None)
+def _build_parser():
+    """Создает парсер аргументов командной строки (один раз за процесс)."""
     parser = argparse.ArgumentParser(
         description='Интерпретатор для учебной виртуальной машины (УВМ) - Вариант №3\n'
                     'Этап 3: Интерпретатор и операции с памятью',
@@ -459,13 +739,23 @@ def main():
                '  python interpreter.py program.bin\n'
                '  python interpreter.py program.bin --dump-memory\n'
                '  python interpreter.py program.bin --dump-memory --dump-start 0 --dump-end 32\n'
+               '  python interpreter.py --batch a.bin:a.xml b.bin:b.xml\n'
     )
     
     parser.add_argument(
         'binary_file',
+        nargs='?',
         help='Путь к бинарному файлу с ассемблированной программой'
     )
     
+    parser.add_argument(
+        '--batch',
+        nargs='+',
+        metavar='SRC:DST',
+        help='Выполнить несколько программ за один запуск (пары BIN:XML, '
+             'для каждой программы сохраняется дамп памяти в XML)'
+    )
+    
     parser.add_argument(
         '--dump-memory',
         action='store_true',
@@ -502,19 +792,69 @@ def main():
     parser.add_argument(
         '--verbose',
         action='store_true',
-        help='Подробный вывод'
+        help='Подробный вывод: трассировка выполнения по шагам и содержимое XML дампа'
     )
     
-    args = parser.parse_args()
+    return parser
+
+
+def _run_program(args):
+    """
+    Выполняет одну программу с заданными аргументами CLI.
     
+    Returns:
+        bool: True если успешно, False в противном случае
+    """
     # Проверяем существование файла
     if not os.path.exists(args.binary_file):
-        print(f"❌ Ошибка: файл программы '{args.binary_file}' не найден")
-        sys.exit(1)
+        print(f"❌ Ошибка: файл программы '{args.binary_file}' не найден", file=sys.stderr)
+        return False
     
     # Запускаем интерпретатор
-    interpreter = InterpreterCLI()
-    interpreter.run(args)
+    try:
+        InterpreterCLI().run(args)
+    except SystemExit as e:
+        return not e.code
+    return True
+
+
+def main(argv=None):
+    """
+    Точка входа в интерпретатор.
+    
+    Args:
+        argv: Аргументы командной строки (None - взять из sys.argv)
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    
+    if not args.batch:
+        if not args.binary_file:
+            parser.error("требуется binary_file (или --batch)")
+        if not _run_program(args):
+            sys.exit(1)
+        return
+    
+    if args.binary_file:
+        parser.error("--batch нельзя совмещать с binary_file")
+    try:
+        pairs = [split_path_pair(pair) for pair in args.batch]
+    except ValueError as e:
+        parser.error(str(e))
+    
+    # Все программы выполняются в одном процессе; ошибка в одной
+    # из них не прерывает выполнение остальных
+    failed = []
+    for binary_file, dump_output in pairs:
+        program_args = argparse.Namespace(**vars(args))
+        program_args.binary_file = binary_file
+        program_args.dump_memory = True
+        program_args.dump_output = dump_output
+        if not _run_program(program_args):
+            failed.append(binary_file)
+    
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
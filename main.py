@@ -8,6 +8,8 @@ import sys
 import argparse
 import os
 
+from spec import UVMSpec, Command
+
 def main():
     print("🚀 Запуск ассемблера УВМ (Вариант 3)...")
     
@@ -28,110 +30,68 @@ def main():
     
     # Проверка существования файла
     if not os.path.exists(args.input_file):
-        print(f"❌ Ошибка: файл {args.input_file} не найден")
+        print(f"❌ Ошибка: файл {args.input_file} не найден", file=sys.stderr)
         sys.exit(1)
     
     try:
         # Импортируем здесь чтобы избежать циклических импортов
-        sys.path.append(os.path.dirname(__file__))
-        from assembler import Assembler
-        
-        print("🔄 Создание ассемблера...")
+        from assembler import UVMAssembler
+        from encoder import CommandEncoder
         
-        # Создаем ассемблер
-        assembler = Assembler()
+        # Единый конвейер: парсинг и кодирование выполняет UVMAssembler
+        assembler = UVMAssembler()
         
-        # Ассемблируем программу
         print("🔧 Ассемблирование программы...")
-        intermediate_repr = assembler.assemble(args.input_file)
-        
-        # Сохраняем бинарный файл
-        assembler.save_binary(args.output_file)
-        
-        # Режим тестирования - вывод промежуточного представления
-        if args.test:
-            print("\n=== РЕЖИМ ТЕСТИРОВАНИЯ ===")
-            print("📋 Промежуточное представление:")
-            for i, cmd in enumerate(intermediate_repr):
-                print(f"  Команда {i}: {cmd}")
-            
-            print("\n🔢 Бинарное представление команд:")
-            hex_list = assembler.get_binary_hex()
-            for i, hex_str in enumerate(hex_list):
-                print(f"  Команда {i}: {hex_str}")
+        if not assembler.assemble(args.input_file, args.output_file, args.test):
+            sys.exit(1)
         
         print(f"\n✅ Программа успешно ассемблирована")
-        print(f"   📊 Команд: {len(intermediate_repr)}")
-        print(f"   📏 Байт: {len(assembler.binary_code)}")
+        print(f"   📊 Команд: {len(assembler.intermediate)}")
+        print(f"   📏 Байт: {len(assembler.binary_data)}")
         
         # Демонстрация тестов из спецификации
         if args.test:
             print("\n=== ТЕСТЫ ИЗ СПЕЦИФИКАЦИИ УВМ ===")
-            _run_specification_tests(assembler)
+            _run_specification_tests(CommandEncoder())
         
     except ImportError as e:
-        print(f"❌ Ошибка импорта: {e}")
-        print("   Убедитесь что установлен PyYAML: pip install pyyaml")
-        sys.exit(1)
-    except Exception as e:
-        print(f"❌ Ошибка: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"❌ Ошибка импорта: {e}", file=sys.stderr)
+        print("   Убедитесь что установлен PyYAML: pip install pyyaml", file=sys.stderr)
         sys.exit(1)
 
-def _run_specification_tests(assembler):
+def _run_specification_tests(encoder):
     """Запускает тесты из спецификации УВМ Варианта 3"""
     test_cases = [
-        ("LOAD 515 в регистр 4", 
-         {"command": "LOAD", "value": 515, "register": 4}, 
+        ("LOAD 515 в регистр 4",
+         Command(1, UVMSpec.LOAD_CONST, 515, 4, ""),
          [0xDD, 0x80, 0x00, 0x10]),
         
-        ("READ из памяти (регистр 2) в регистр 0", 
-         {"command": "READ", "dest_register": 0, "addr_register": 2}, 
+        ("READ из памяти (регистр 2) в регистр 0",
+         Command(2, UVMSpec.READ_MEM, 0, 2, ""),
          [0x12, 0x10, 0x00, 0x00]),
         
-        ("WRITE регистр 24 в память (адрес в регистре 13)", 
-         {"command": "WRITE", "addr_register": 13, "src_register": 24}, 
+        ("WRITE регистр 24 в память (адрес в регистре 13)",
+         Command(3, UVMSpec.WRITE_MEM, 13, 24, ""),
          [0x49, 0xC3, 0x00, 0x00]),
         
-        ("ABS регистра 22 в память (адрес в регистре 26)", 
-         {"command": "ABS", "addr_register": 26, "src_register": 22}, 
+        ("ABS регистра 22 в память (адрес в регистре 26)",
+         Command(4, UVMSpec.ABS, 26, 22, ""),
          [0x99, 0xB6, 0x00, 0x00]),
     ]
     
     for name, command, expected_bytes in test_cases:
         print(f"\n🧪 Тест: {name}")
-        print(f"  📥 Входные данные: {command}")
+        print(f"  📥 Входные данные: A={command.opcode}, B={command.B}, C={command.C}")
         print(f"  🎯 Ожидается байты: {[hex(b) for b in expected_bytes]}")
         
-        # Тестируем парсинг команды
-        try:
-            intermediate = assembler._parse_command_test(command, 0)
-            print(f"  ✅ Промежуточное представление: {intermediate}")
-            
-            # Тестируем генерацию бинарного кода
-            binary = assembler._generate_binary(intermediate)
-            actual_bytes = list(binary)
-            
-            if actual_bytes == expected_bytes:
-                print(f"  ✅ Бинарный код совпадает: {[hex(b) for b in actual_bytes]}")
-            else:
-                print(f"  ❌ Бинарный код не совпадает:")
-                print(f"     Получено: {[hex(b) for b in actual_bytes]}")
-                print(f"     Ожидалось: {[hex(b) for b in expected_bytes]}")
-            
-            # Проверяем соответствие спецификации
-            if intermediate['opcode'] == 29:  # LOAD
-                print(f"  ✅ A=29, B={intermediate.get('value', 'N/A')}, C={intermediate.get('register', 'N/A')}")
-            elif intermediate['opcode'] == 18:  # READ
-                print(f"  ✅ A=18, B={intermediate.get('dest_register', 'N/A')}, C={intermediate.get('addr_register', 'N/A')}")
-            elif intermediate['opcode'] == 9:   # WRITE
-                print(f"  ✅ A=9, B={intermediate.get('addr_register', 'N/A')}, C={intermediate.get('src_register', 'N/A')}")
-            elif intermediate['opcode'] == 25:  # ABS
-                print(f"  ✅ A=25, B={intermediate.get('addr_register', 'N/A')}, C={intermediate.get('src_register', 'N/A')}")
-                
-        except Exception as e:
-            print(f"  ❌ Ошибка: {e}")
+        actual_bytes = list(encoder.encode_command(command))
+        
+        if actual_bytes == expected_bytes:
+            print(f"  ✅ Бинарный код совпадает: {[hex(b) for b in actual_bytes]}")
+        else:
+            print(f"  ❌ Бинарный код не совпадает:")
+            print(f"     Получено: {[hex(b) for b in actual_bytes]}")
+            print(f"     Ожидалось: {[hex(b) for b in expected_bytes]}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
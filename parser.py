@@ -4,14 +4,138 @@
 
 import yaml
 import sys
-from spec import UVMSpec
+from spec import UVMSpec, IntermediateProgram
+
+# C-загрузчик на базе libyaml в разы быстрее чистого Python SafeLoader
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+# Определение типов узлов как в SafeLoader (без состояния, общий для всех)
+_RESOLVER = yaml.resolver.Resolver()
+
+# Тег ключа слияния (<<)
+_MERGE_TAG = 'tag:yaml.org,2002:merge'
+
+
+def _next_node_event(events):
+    """Пропускает служебные события потока и возвращает первое событие узла."""
+    for event in events:
+        if isinstance(event, (yaml.StreamStartEvent, yaml.DocumentStartEvent)):
+            continue
+        if isinstance(event, yaml.StreamEndEvent):
+            return None
+        return event
+    return None
+
+
+def _compose_node(events, event, anchors):
+    """
+    Собирает узел YAML, начинающийся с event, из следующих событий.
+    
+    Повторяет yaml.composer.Composer для одного узла: теги определяются
+    резолвером SafeLoader, ссылки (*alias) разрешаются по anchors.
+    
+    Args:
+        events: Итератор событий YAML
+        event: Первое событие узла
+        anchors: Словарь якорей: имя -> узел
+        
+    Returns:
+        yaml.Node: Узел (скалярный, последовательность или отображение)
+    """
+    if isinstance(event, yaml.AliasEvent):
+        if event.anchor not in anchors:
+            raise ValueError(f"Неизвестная ссылка на якорь: {event.anchor}")
+        return anchors[event.anchor]
+    
+    tag = event.tag
+    if isinstance(event, yaml.ScalarEvent):
+        if tag is None or tag == '!':
+            tag = _RESOLVER.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, event.style)
+    elif isinstance(event, yaml.SequenceStartEvent):
+        if tag is None or tag == '!':
+            tag = _RESOLVER.resolve(yaml.SequenceNode, None, event.implicit)
+        node = yaml.SequenceNode(tag, [], event.start_mark, None, event.flow_style)
+        for item_event in events:
+            if isinstance(item_event, yaml.SequenceEndEvent):
+                node.end_mark = item_event.end_mark
+                break
+            node.value.append(_compose_node(events, item_event, anchors))
+    elif isinstance(event, yaml.MappingStartEvent):
+        if tag is None or tag == '!':
+            tag = _RESOLVER.resolve(yaml.MappingNode, None, event.implicit)
+        node = yaml.MappingNode(tag, [], event.start_mark, None, event.flow_style)
+        for key_event in events:
+            if isinstance(key_event, yaml.MappingEndEvent):
+                node.end_mark = key_event.end_mark
+                break
+            key = _compose_node(events, key_event, anchors)
+            node.value.append((key, _compose_node(events, next(events), anchors)))
+    else:
+        raise ValueError(f"Неожиданное событие YAML: {event}")
+    
+    if event.anchor is not None:
+        anchors[event.anchor] = node
+    return node
+
+
+def _event_builder(events):
+    """
+    Создает функции сборки значений YAML из потока событий.
+    
+    Узлы собираются по событиям с общим словарем якорей, значения строит
+    SafeConstructor, как в yaml.safe_load (включая ключи слияния <<).
+    construct_document очищает его кэши после каждого узла, поэтому память
+    не растет с числом собранных значений.
+    
+    Args:
+        events: Итератор событий YAML
+        
+    Returns:
+        tuple: (compose(event) -> узел, construct(node) -> значение)
+    """
+    anchors = {}
+    constructor = yaml.constructor.SafeConstructor()
+    
+    def compose(event):
+        return _compose_node(events, event, anchors)
+    
+    return compose, constructor.construct_document
+
+
+def _merge_mappings(value):
+    """
+    Объединяет значение ключа слияния (<<) в один словарь, как SafeConstructor.
+    
+    Значение - отображение или список отображений; при совпадении ключей
+    в списке побеждает отображение, стоящее раньше.
+    
+    Raises:
+        ValueError: Если значение не является отображением или списком отображений
+    """
+    mappings = value if isinstance(value, list) else [value]
+    if not all(isinstance(mapping, dict) for mapping in mappings):
+        raise ValueError("Ключ слияния << должен ссылаться на отображение или список отображений")
+    
+    merged = {}
+    for mapping in reversed(mappings):
+        merged.update(mapping)
+    return merged
+
 
 class YamlParser:
     """Парсер YAML файлов для УВМ."""
     
-    def __init__(self):
-        self.intermediate_repr = []
+    # Обязательные поля каждой команды
+    REQUIRED_FIELDS = ('opcode', 'operands')
+    
+    def __init__(self, verbose=False):
+        self.intermediate_repr = IntermediateProgram()
         self.errors = []
+        self.verbose = verbose
     
     def parse(self, yaml_path):
         """
@@ -21,28 +145,19 @@ class YamlParser:
             yaml_path: Путь к YAML файлу
             
         Returns:
-            list: Промежуточное представление программы
+            IntermediateProgram: Промежуточное представление программы
             
         Raises:
             FileNotFoundError: Если файл не найден
             ValueError: Если структура YAML некорректна
         """
+        self.intermediate_repr = IntermediateProgram()
+        self.errors = []
+        
         try:
-            with open(yaml_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-            
-            self.intermediate_repr = []
-            self.errors = []
-            
-            # Проверяем структуру YAML
-            if data is None:
-                raise ValueError("YAML файл пуст")
-            
-            if 'commands' not in data:
-                raise ValueError("YAML файл должен содержать ключ 'commands'")
-            
-            # Парсим команды
-            for cmd_idx, cmd_data in enumerate(data['commands'], 1):
+            # Команды разбираются по мере чтения событий YAML,
+            # дерево всего документа в памяти не строится
+            for cmd_idx, cmd_data in self.iter_commands(yaml_path):
                 try:
                     self._parse_command(cmd_idx, cmd_data)
                 except Exception as e:
@@ -53,7 +168,8 @@ class YamlParser:
                 error_msg = "\n".join(self.errors)
                 raise ValueError(f"Ошибки при парсинге:\n{error_msg}")
             
-            print(f"✓ Успешно загружено {len(self.intermediate_repr)} команд")
+            if self.verbose:
+                print(f"✓ Успешно загружено {len(self.intermediate_repr)} команд")
             return self.intermediate_repr
             
         except FileNotFoundError:
@@ -61,28 +177,169 @@ class YamlParser:
         except yaml.YAMLError as e:
             raise ValueError(f"Ошибка парсинга YAML: {e}")
     
+    def iter_commands(self, yaml_path):
+        """
+        Потоково читает YAML файл и выдает команды из списка 'commands'.
+        
+        Используется событийный API (yaml.parse): каждая команда собирается
+        из своих событий и сразу отдается вызывающему, поэтому в памяти
+        находится только текущая команда. Список, заданный ссылкой (*alias)
+        или ключом слияния (<<), собирается целиком.
+        
+        Args:
+            yaml_path: Путь к YAML файлу
+            
+        Yields:
+            tuple: (номер команды с 1, данные команды)
+            
+        Raises:
+            FileNotFoundError: Если файл не найден
+            ValueError: Если структура YAML некорректна
+            yaml.YAMLError: Если файл не является корректным YAML
+        """
+        # Читаем байты: libyaml сам декодирует UTF-8 без Python-обертки
+        with open(yaml_path, 'rb') as f:
+            events = yaml.parse(f, Loader=_Loader)
+            compose, construct = _event_builder(events)
+            
+            event = _next_node_event(events)
+            if event is None or (isinstance(event, yaml.ScalarEvent)
+                                 and construct(compose(event)) is None):
+                raise ValueError("YAML файл пуст")
+            
+            if not isinstance(event, yaml.MappingStartEvent):
+                raise ValueError("YAML файл должен содержать ключ 'commands'")
+            
+            has_commands = False
+            merged_commands = None
+            for key_event in events:
+                if isinstance(key_event, yaml.MappingEndEvent):
+                    break
+                
+                key_node = compose(key_event)
+                value_event = next(events)
+                
+                if key_node.tag == _MERGE_TAG:
+                    # Список из ключа слияния используется, только если
+                    # явного ключа 'commands' нет (как в yaml.safe_load)
+                    merged = _merge_mappings(construct(compose(value_event)))
+                    if 'commands' in merged:
+                        merged_commands = merged['commands']
+                    continue
+                
+                if construct(key_node) != 'commands':
+                    compose(value_event)
+                    continue
+                
+                # yaml.safe_load оставил бы последний список, но команды
+                # первого уже выданы вызывающему
+                if has_commands:
+                    raise ValueError("Ключ 'commands' указан в YAML файле несколько раз")
+                has_commands = True
+                
+                if isinstance(value_event, yaml.SequenceStartEvent) and value_event.anchor is None:
+                    cmd_idx = 0
+                    for item_event in events:
+                        if isinstance(item_event, yaml.SequenceEndEvent):
+                            break
+                        cmd_idx += 1
+                        yield cmd_idx, construct(compose(item_event))
+                    continue
+                
+                # Ссылка (*alias) или список с якорем: узел собирается целиком
+                node = compose(value_event)
+                if not isinstance(node, yaml.SequenceNode):
+                    raise ValueError("Ключ 'commands' должен содержать список команд")
+                for cmd_idx, item_node in enumerate(node.value, 1):
+                    yield cmd_idx, construct(item_node)
+            
+            if not has_commands:
+                if merged_commands is None:
+                    raise ValueError("YAML файл должен содержать ключ 'commands'")
+                if not isinstance(merged_commands, list):
+                    raise ValueError("Ключ 'commands' должен содержать список команд")
+                yield from enumerate(merged_commands, 1)
+            
+            # Дочитываем поток, чтобы синтаксические ошибки не остались
+            # незамеченными; второй документ - ошибка, как в yaml.safe_load
+            for extra_event in events:
+                if isinstance(extra_event, yaml.DocumentStartEvent):
+                    raise yaml.composer.ComposerError(
+                        "expected a single document in the stream", event.start_mark,
+                        "but found another document", extra_event.start_mark
+                    )
+    
+    def peek_header(self, yaml_path):
+        """
+        Читает только заголовок YAML файла (ключи до списка 'commands').
+        
+        Позволяет получить метаданные программы (например, версию)
+        без разбора всего списка команд: события YAML читаются до ключа
+        'commands', остальная часть файла не разбирается.
+        
+        Args:
+            yaml_path: Путь к YAML файлу
+            
+        Returns:
+            dict: Ключи заголовка (пустой словарь, если заголовка нет)
+            
+        Raises:
+            FileNotFoundError: Если файл не найден
+            ValueError: Если заголовок не является корректным YAML
+        """
+        header = {}
+        merged = {}
+        try:
+            with open(yaml_path, 'rb') as f:
+                events = yaml.parse(f, Loader=_Loader)
+                compose, construct = _event_builder(events)
+                
+                if not isinstance(_next_node_event(events), yaml.MappingStartEvent):
+                    return header
+                
+                for key_event in events:
+                    if isinstance(key_event, yaml.MappingEndEvent):
+                        break
+                    key_node = compose(key_event)
+                    if key_node.tag == _MERGE_TAG:
+                        merged.update(_merge_mappings(construct(compose(next(events)))))
+                        continue
+                    key = construct(key_node)
+                    if key == 'commands':
+                        break
+                    header[key] = construct(compose(next(events)))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Файл {yaml_path} не найден")
+        except yaml.YAMLError as e:
+            raise ValueError(f"Ошибка парсинга заголовка YAML: {e}")
+        
+        # Явные ключи заголовка важнее ключей из слияния (<<)
+        merged.pop('commands', None)
+        merged.update(header)
+        return merged
+    
     def _parse_command(self, cmd_idx, cmd_data):
         """Парсит одну команду."""
         # Проверяем обязательные поля
-        if 'opcode' not in cmd_data:
-            raise ValueError("Отсутствует поле 'opcode'")
-        
-        if 'operands' not in cmd_data:
-            raise ValueError("Отсутствует поле 'operands'")
+        missing = [key for key in self.REQUIRED_FIELDS if key not in cmd_data]
+        if missing:
+            names = ", ".join(f"'{key}'" for key in missing)
+            prefix = "Отсутствует поле" if len(missing) == 1 else "Отсутствуют поля"
+            raise ValueError(f"{prefix} {names}")
         
-        opcode = cmd_data['opcode']
+        opcode = UVMSpec.resolve_opcode(cmd_data['opcode'])
         operands = cmd_data['operands']
+        if isinstance(operands, dict):
+            b, c = operands.get('B'), operands.get('C')
+        else:
+            b = c = None
         
         # Валидируем команду
-        UVMSpec.validate_command(opcode, operands)
+        UVMSpec.validate_command(opcode, b, c)
         
         # Добавляем в промежуточное представление
-        self.intermediate_repr.append({
-            'index': cmd_idx,
-            'opcode': opcode,
-            'operands': operands,
-            'description': UVMSpec.get_command_description(opcode, operands)
-        })
+        # (описание не сохраняется: оно формируется при обращении к команде)
+        self.intermediate_repr.append(opcode, b, c)
     
     def print_intermediate(self, intermediate_repr):
         """Выводит промежуточное представление в читаемом формате."""
@@ -91,9 +348,9 @@ class YamlParser:
         print("="*60)
         
         for cmd in intermediate_repr:
-            print(f"\nКоманда {cmd['index']}:")
-            print(f"  Опкод: {cmd['opcode']} ({UVMSpec.OPCODE_NAMES.get(cmd['opcode'], 'UNKNOWN')})")
-            print(f"  Операнды: {cmd['operands']}")
-            print(f"  Описание: {cmd['description']}")
+            print(f"\nКоманда {cmd.index}:")
+            print(f"  Опкод: {cmd.opcode} ({UVMSpec.OPCODE_NAMES.get(cmd.opcode, 'UNKNOWN')})")
+            print(f"  Операнды: {{'B': {cmd.B}, 'C': {cmd.C}}}")
+            print(f"  Описание: {cmd.description}")
         
         print("\n" + "="*60)
\ No newline at end of file
@@ -2,6 +2,59 @@
 Содержит константы, структуры данных и утилиты для работы со спецификацией.
 """
 
+import functools
+import sys
+import types
+from array import array
+from collections import namedtuple
+
+# Команда в промежуточном представлении: плоский кортеж вместо вложенных словарей
+Command = namedtuple('Command', ['index', 'opcode', 'B', 'C', 'description'])
+
+
+class IntermediateProgram:
+    """
+    Промежуточное представление программы в виде структуры массивов.
+    
+    Опкоды и операнды хранятся в трех параллельных массивах array('I').
+    Доступ по индексу и итерация возвращают команды в виде Command;
+    описание команды (нужно только для вывода) формируется при обращении.
+    """
+    
+    def __init__(self):
+        self.opcodes = array('I')
+        self.B = array('I')
+        self.C = array('I')
+    
+    def append(self, opcode, b, c):
+        """Добавляет команду в конец программы."""
+        self.opcodes.append(opcode)
+        self.B.append(b)
+        self.C.append(c)
+    
+    def __len__(self):
+        return len(self.opcodes)
+    
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(len(self.opcodes)))]
+        
+        # Отрицательная позиция отсчитывается с конца; номер команды
+        # (Command.index) всегда считается от начала программы
+        if pos < 0:
+            pos += len(self.opcodes)
+        if not 0 <= pos < len(self.opcodes):
+            raise IndexError("Номер команды вне диапазона программы")
+        
+        opcode, b, c = self.opcodes[pos], self.B[pos], self.C[pos]
+        return Command(pos + 1, opcode, b, c,
+                       UVMSpec.get_command_description(opcode, b, c))
+    
+    def __iter__(self):
+        for pos in range(len(self.opcodes)):
+            yield self[pos]
+
+
 class UVMSpec:
     """Спецификация УВМ для Варианта №3."""
     
@@ -19,6 +72,10 @@ class UVMSpec:
         ABS: "ABS"
     }
     
+    # Обратная таблица мнемоник; строки интернированы, поэтому поиск
+    # по уже интернированному имени сравнивает указатели до хэширования
+    OPCODES_BY_NAME = {sys.intern(name): opcode for opcode, name in OPCODE_NAMES.items()}
+    
     # Описание команд
     OPCODE_DESCRIPTIONS = {
         LOAD_CONST: "Загрузить константу в регистр",
@@ -35,43 +92,89 @@ class UVMSpec:
         ABS: 4
     }
     
+    # Расположение битовых полей команды
+    OP_MASK = 0x3F         # Поле A (опкод): 6 бит, позиция 0
+    B_SHIFT = 6            # Поле B начинается с бита 6 во всех форматах
+    LC_B_MASK = 0xFFFFF    # LOAD_CONST: B - константа, 20 бит
+    LC_C_SHIFT = 26        # LOAD_CONST: C - адрес, позиция 26
+    RF_B_SHIFT = B_SHIFT   # Остальные команды: B - адрес, позиция 6
+    RF_C_SHIFT = 11        # Остальные команды: C - адрес, позиция 11
+    RF_REG_MASK = 0x1F     # Адрес регистра: 5 бит
+    
     # Битовые маски для полей
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def get_field_masks(opcode):
-        """Возвращает маски битовых полей для команды."""
+        """
+        Возвращает маски битовых полей для команды.
+        
+        Результат кэшируется и общий для всех вызывающих, поэтому
+        возвращается неизменяемое отображение: поле -> (маска, сдвиг).
+        """
         if opcode == UVMSpec.LOAD_CONST:
-            return {
-                'A': (0x3F, 0),      # 6 бит, позиция 0
-                'B': (0xFFFFF, 6),   # 20 бит, позиция 6
-                'C': (0x1F, 26)      # 5 бит, позиция 26
-            }
+            return types.MappingProxyType({
+                'A': (UVMSpec.OP_MASK, 0),
+                'B': (UVMSpec.LC_B_MASK, UVMSpec.B_SHIFT),
+                'C': (UVMSpec.RF_REG_MASK, UVMSpec.LC_C_SHIFT)
+            })
         else:  # READ_MEM, WRITE_MEM, ABS
-            return {
-                'A': (0x3F, 0),      # 6 бит, позиция 0
-                'B': (0x1F, 6),      # 5 бит, позиция 6
-                'C': (0x1F, 11)      # 5 бит, позиция 11
-            }
+            return types.MappingProxyType({
+                'A': (UVMSpec.OP_MASK, 0),
+                'B': (UVMSpec.RF_REG_MASK, UVMSpec.RF_B_SHIFT),
+                'C': (UVMSpec.RF_REG_MASK, UVMSpec.RF_C_SHIFT)
+            })
     
     @staticmethod
-    def validate_command(opcode, operands):
-        """Проверяет корректность команды."""
-        if opcode not in [UVMSpec.LOAD_CONST, UVMSpec.READ_MEM, 
-                         UVMSpec.WRITE_MEM, UVMSpec.ABS]:
+    def resolve_opcode(opcode):
+        """
+        Возвращает числовой опкод по числу или мнемонике команды.
+        
+        Мнемоника принимается в любом регистре: 'LOAD_CONST', 'load_const'.
+        """
+        if not isinstance(opcode, str):
+            return opcode
+        
+        code = UVMSpec.OPCODES_BY_NAME.get(opcode)
+        if code is None:
+            code = UVMSpec.OPCODES_BY_NAME.get(sys.intern(opcode.upper()))
+        if code is None:
+            raise ValueError(f"Неизвестная мнемоника команды: {opcode}")
+        return code
+    
+    # Допустимые значения операндов: (операнд, максимум, название, диапазон).
+    # Максимумы - те же маски полей, что используются при кодировании
+    OPERAND_LIMITS = {
+        LOAD_CONST: (('B', LC_B_MASK, "Константа", f"0..0x{LC_B_MASK:X}"),
+                     ('C', RF_REG_MASK, "Адрес", f"0..{RF_REG_MASK}")),
+        READ_MEM: (('B', RF_REG_MASK, "Адрес", f"0..{RF_REG_MASK}"),
+                   ('C', RF_REG_MASK, "Адрес", f"0..{RF_REG_MASK}")),
+        WRITE_MEM: (('B', RF_REG_MASK, "Адрес", f"0..{RF_REG_MASK}"),
+                    ('C', RF_REG_MASK, "Адрес", f"0..{RF_REG_MASK}")),
+        ABS: (('B', RF_REG_MASK, "Адрес", f"0..{RF_REG_MASK}"),
+              ('C', RF_REG_MASK, "Адрес", f"0..{RF_REG_MASK}"))
+    }
+    
+    @staticmethod
+    def validate_command(opcode, b, c):
+        """
+        Проверяет корректность команды по таблице OPERAND_LIMITS.
+        
+        Args:
+            opcode: Опкод команды
+            b: Операнд B (None - операнд отсутствует)
+            c: Операнд C (None - операнд отсутствует)
+        """
+        limits = UVMSpec.OPERAND_LIMITS.get(opcode)
+        if limits is None:
             raise ValueError(f"Неизвестный опкод: {opcode}")
         
-        if 'B' not in operands or 'C' not in operands:
+        if b is None or c is None:
             raise ValueError(f"Команда требует операнды B и C")
         
         # Проверка диапазонов
-        if opcode == UVMSpec.LOAD_CONST:
-            if not (0 <= operands['B'] <= 0xFFFFF):
-                raise ValueError(f"Константа B={operands['B']} вне диапазона 0..0xFFFFF")
-        else:
-            if not (0 <= operands['B'] <= 0x1F):
-                raise ValueError(f"Адрес B={operands['B']} вне диапазона 0..31")
-        
-        if not (0 <= operands['C'] <= 0x1F):
-            raise ValueError(f"Адрес C={operands['C']} вне диапазона 0..31")
+        for (name, maximum, label, value_range), value in zip(limits, (b, c)):
+            if not (0 <= value <= maximum):
+                raise ValueError(f"{label} {name}={value} вне диапазона {value_range}")
         
         return True
     
@@ -81,17 +184,23 @@ class UVMSpec:
         return ", ".join(f"0x{b:02X}" for b in bytes_data)
     
     @staticmethod
-    def get_command_description(opcode, operands):
-        """Возвращает текстовое описание команды."""
+    @functools.lru_cache(maxsize=4096)
+    def get_command_description(opcode, b, c):
+        """
+        Возвращает текстовое описание команды.
+        
+        Результат кэшируется по (opcode, b, c): в фиксированной программе
+        одни и те же команды повторяются, и строка форматируется один раз.
+        """
         name = UVMSpec.OPCODE_NAMES.get(opcode, "UNKNOWN")
         
         if opcode == UVMSpec.LOAD_CONST:
-            return f"{name}: Загрузить константу {operands['B']} в регистр R{operands['C']}"
+            return f"{name}: Загрузить константу {b} в регистр R{c}"
         elif opcode == UVMSpec.READ_MEM:
-            return f"{name}: Прочитать из памяти адреса R{operands['C']} в регистр R{operands['B']}"
+            return f"{name}: Прочитать из памяти адреса R{c} в регистр R{b}"
         elif opcode == UVMSpec.WRITE_MEM:
-            return f"{name}: Записать из регистра R{operands['C']} в память адреса R{operands['B']}"
+            return f"{name}: Записать из регистра R{c} в память адреса R{b}"
         elif opcode == UVMSpec.ABS:
-            return f"{name}: Взять модуль из регистра R{operands['C']}, записать в память адреса R{operands['B']}"
+            return f"{name}: Взять модуль из регистра R{c}, записать в память адреса R{b}"
         else:
-            return f"{name}: Неизвестная команда"
\ No newline at end of file
+            return f"{name}: Неизвестная команда"
@@ -0,0 +1,264 @@
+"""
+Тестовый скрипт для проверки ассемблера УВМ (парсер YAML и кодировщик).
+
+Запуск как скрипта: python test_assembler.py
+Запуск через pytest: pytest test_assembler.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+import yaml
+
+import assembler
+from assembler import UVMAssembler
+from encoder import CommandEncoder
+from parser import YamlParser
+from spec import IntermediateProgram
+
+
+def _write(directory, name, text):
+    """Создает файл с текстом в каталоге и возвращает путь к нему."""
+    path = os.path.join(str(directory), name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def test_program_indexing(tmp_path):
+    """Отрицательные индексы и срезы программы дают команды с верными номерами."""
+    program = IntermediateProgram()
+    for b in (10, 20, 30):
+        program.append(29, b, 1)
+    
+    assert (program[-1].index, program[-1].B) == (3, 30)
+    assert [cmd.index for cmd in program[0:2]] == [1, 2]
+    assert [cmd.B for cmd in program[::-1]] == [30, 20, 10]
+    
+    try:
+        program[3]
+    except IndexError:
+        pass
+    else:
+        raise AssertionError("индекс за концом программы не вызвал IndexError")
+
+
+def test_merge_keys(tmp_path):
+    """Ключи слияния (<<) разворачиваются так же, как в yaml.safe_load."""
+    path = _write(tmp_path, "merge.yaml",
+                  "base: &b {B: 1, C: 2}\n"
+                  "commands:\n"
+                  "  - {opcode: 29, operands: {<<: *b, C: 5}}\n"
+                  "  - opcode: READ_MEM\n"
+                  "    operands:\n"
+                  "      <<: *b\n")
+    
+    commands = [cmd for _, cmd in YamlParser().iter_commands(path)]
+    with open(path, "rb") as f:
+        assert commands == yaml.safe_load(f)["commands"]
+    
+    program = YamlParser().parse(path)
+    assert list(program.B) == [1, 1]
+    assert list(program.C) == [5, 2]
+
+
+def test_commands_alias(tmp_path):
+    """Список команд, заданный ссылкой (*alias), совпадает с yaml.safe_load."""
+    path = _write(tmp_path, "alias.yaml",
+                  "base: &p\n"
+                  "  - {opcode: 29, operands: {B: 7, C: 1}}\n"
+                  "  - {opcode: READ_MEM, operands: {B: 2, C: 1}}\n"
+                  "commands: *p\n")
+    
+    commands = [cmd for _, cmd in YamlParser().iter_commands(path)]
+    with open(path, "rb") as f:
+        assert commands == yaml.safe_load(f)["commands"]
+    assert list(YamlParser().parse(path).B) == [7, 2]
+
+
+def test_top_level_merge_key(tmp_path):
+    """Ключ 'commands' из слияния верхнего уровня (<<) - как в yaml.safe_load."""
+    path = _write(tmp_path, "merge_top.yaml",
+                  "defaults: &b\n"
+                  "  commands:\n"
+                  "    - {opcode: 29, operands: {B: 3, C: 4}}\n"
+                  "<<: *b\n")
+    
+    commands = [cmd for _, cmd in YamlParser().iter_commands(path)]
+    with open(path, "rb") as f:
+        assert commands == yaml.safe_load(f)["commands"]
+    
+    # Явный ключ 'commands' важнее ключа из слияния
+    path = _write(tmp_path, "merge_override.yaml",
+                  "defaults: &b\n"
+                  "  commands:\n"
+                  "    - {opcode: 29, operands: {B: 3, C: 4}}\n"
+                  "<<: *b\n"
+                  "commands:\n"
+                  "  - {opcode: 29, operands: {B: 5, C: 6}}\n")
+    
+    commands = [cmd for _, cmd in YamlParser().iter_commands(path)]
+    with open(path, "rb") as f:
+        assert commands == yaml.safe_load(f)["commands"]
+
+
+def test_duplicate_commands_rejected(tmp_path):
+    """Повторный ключ 'commands' - явная ошибка, а не склейка списков."""
+    path = _write(tmp_path, "dup.yaml",
+                  "commands:\n"
+                  "  - {opcode: 29, operands: {B: 1, C: 2}}\n"
+                  "commands:\n"
+                  "  - {opcode: 29, operands: {B: 3, C: 4}}\n")
+    
+    # yaml.safe_load молча оставляет только последний список
+    with open(path, "rb") as f:
+        assert len(yaml.safe_load(f)["commands"]) == 1
+    
+    try:
+        YamlParser().parse(path)
+    except ValueError as e:
+        assert "несколько раз" in str(e)
+    else:
+        raise AssertionError("повторный ключ 'commands' не вызвал ошибку")
+
+
+def test_second_document_rejected(tmp_path):
+    """Файл с несколькими документами отклоняется, как в yaml.safe_load."""
+    path = _write(tmp_path, "two.yaml",
+                  "commands:\n"
+                  "  - {opcode: 29, operands: {B: 1, C: 2}}\n"
+                  "---\n"
+                  "commands: []\n")
+    
+    try:
+        YamlParser().parse(path)
+    except ValueError as e:
+        assert "expected a single document" in str(e)
+    else:
+        raise AssertionError("второй документ YAML не вызвал ошибку")
+
+
+def test_peek_header(tmp_path):
+    """Заголовок читается до ключа 'commands' независимо от числа строк."""
+    path = _write(tmp_path, "header.yaml",
+                  "# Программа копирования массива\n"
+                  "#\n"
+                  "# Комментарии не входят в заголовок\n"
+                  "\n"
+                  "name: copy_array\n"
+                  "meta:\n"
+                  "  version: 2\n"
+                  "  authors:\n"
+                  "    - first\n"
+                  "    - second\n"
+                  "  tags: [memory, copy]\n"
+                  "commands:\n"
+                  "  - {opcode: LOAD_CONST, operands: {B: 1, C: 2}}\n"
+                  "  - [не разбирается\n")
+    
+    assert YamlParser().peek_header(path) == {
+        "name": "copy_array",
+        "meta": {"version": 2, "authors": ["first", "second"], "tags": ["memory", "copy"]},
+    }
+    
+    # Файл без заголовка
+    path = _write(tmp_path, "plain.yaml", "commands: []\n")
+    assert YamlParser().peek_header(path) == {}
+
+
+def test_incremental_matches_full(tmp_path):
+    """Инкрементальная сборка после правки команды совпадает с полной."""
+    program = ("commands:\n"
+               "  - {opcode: LOAD_CONST, operands: {B: 100, C: 1}}\n"
+               "  - {opcode: READ_MEM, operands: {B: 2, C: 1}}\n"
+               "  - {opcode: WRITE_MEM, operands: {B: 1, C: 2}}\n")
+    path = _write(tmp_path, "prog.yaml", program)
+    output_bin = os.path.join(str(tmp_path), "prog.bin")
+    
+    uvm_assembler = UVMAssembler()
+    assert uvm_assembler.assemble_incremental(path, output_bin)
+    
+    # Изменяется одна команда: B у READ_MEM
+    _write(tmp_path, "prog.yaml", program.replace("{B: 2, C: 1}", "{B: 3, C: 1}"))
+    assert uvm_assembler.assemble_incremental(path, output_bin, changed_lines=[2])
+    assert uvm_assembler.encoder.dirty_count == 1
+    
+    expected = CommandEncoder().encode_program(YamlParser().parse(path))
+    assert uvm_assembler.binary_data == expected
+    with open(output_bin, "rb") as f:
+        assert f.read() == bytes(expected)
+
+
+def _assemble_cli(argv):
+    """Вызывает CLI ассемблера в текущем процессе и возвращает его вывод."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        assembler.main(argv)
+    return output.getvalue()
+
+
+def test_skip_unchanged(tmp_path):
+    """--skip-unchanged пропускает сборку, пока YAML не новее бинарного файла."""
+    path = _write(tmp_path, "prog.yaml",
+                  "commands:\n"
+                  "  - {opcode: LOAD_CONST, operands: {B: 1, C: 2}}\n")
+    output_bin = os.path.join(str(tmp_path), "prog.bin")
+    
+    # Исходник заведомо старше бинарного файла
+    past = os.stat(path).st_mtime - 100
+    os.utime(path, (past, past))
+    assert "пропущено" not in _assemble_cli([path, output_bin, "--skip-unchanged"])
+    with open(output_bin, "rb") as f:
+        built = f.read()
+    
+    # Бинарный файл актуален: сборка пропускается, файл не перезаписывается
+    with open(output_bin, "wb") as f:
+        f.write(b"stale")
+    assert "пропущено" in _assemble_cli([path, output_bin, "--skip-unchanged"])
+    with open(output_bin, "rb") as f:
+        assert f.read() == b"stale"
+    
+    # YAML новее бинарного файла: программа собирается заново
+    future = os.stat(output_bin).st_mtime + 100
+    os.utime(path, (future, future))
+    assert "пропущено" not in _assemble_cli([path, output_bin, "--skip-unchanged"])
+    with open(output_bin, "rb") as f:
+        assert f.read() == built
+
+
+def main():
+    """Запускает все тесты модуля, каждый в собственном временном каталоге."""
+    print("🧪 Тестирование ассемблера УВМ (Этапы 1-2)")
+    print("="*60)
+    
+    tests = [value for name, value in sorted(globals().items())
+             if name.startswith("test_") and callable(value)]
+    
+    failed = []
+    for test in tests:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            try:
+                test(tmp_path)
+            except Exception as e:
+                print(f"❌ {test.__name__}: {e!r}")
+                failed.append(test.__name__)
+            else:
+                print(f"✅ {test.__name__}")
+    
+    print("\n" + "="*60)
+    if failed:
+        print(f"❌ ТЕСТЫ НЕ ПРОЙДЕНЫ: {', '.join(failed)}")
+    else:
+        print("✅ ВСЕ ТЕСТЫ ПРОЙДЕНЫ УСПЕШНО!")
+    print("="*60)
+    
+    return not failed
+
+if __name__ == "__main__":
+    if main():
+        sys.exit(0)
+    else:
+        sys.exit(1)
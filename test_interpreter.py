@@ -1,72 +1,335 @@
 """
 Тестовый скрипт для проверки интерпретатора УВМ.
+
+Запуск как скрипта: python test_interpreter.py
+Запуск через pytest (каждая программа - отдельный тест, можно с pytest-xdist):
+    pytest test_interpreter.py -n auto
 """
 
+import contextlib
+import glob
+import mmap
 import os
-import subprocess
 import sys
+import tempfile
 
-def test_interpreter():
-    """Запускает тесты интерпретатора."""
-    print("🧪 Тестирование интерпретатора УВМ (Этап 3)")
-    print("="*60)
+import assembler
+import interpreter
+from encoder import CommandEncoder
+from spec import UVMSpec, IntermediateProgram
+
+# Корпус тестовых программ: все test_*.yaml рядом со скриптом
+PROGRAMS = sorted(glob.glob(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_*.yaml")
+))
+
+
+def _run_main(main, argv):
+    """
+    Вызывает точку входа CLI в текущем процессе.
+    
+    Обычный вывод CLI отбрасывается, сообщения об ошибках (stderr)
+    сохраняются для отчета о неудачном шаге: в памяти, пока их немного,
+    и во временном файле, если вывод ошибок окажется большим.
+    
+    Returns:
+        tuple: (код возврата, перехваченный вывод stderr)
+    """
+    returncode = 0
+    with open(os.devnull, "w") as devnull, \
+            tempfile.SpooledTemporaryFile(max_size=4096, mode="w+", encoding="utf-8") as errors:
+        with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(errors):
+            try:
+                main(argv)
+            except SystemExit as e:
+                # sys.exit() без аргумента (None) - успешное завершение
+                returncode = 0 if e.code is None else e.code if isinstance(e.code, int) else 1
+        
+        errors.seek(0)
+        return returncode, errors.read()
+
+
+def _read_preview(dump_xml, size=500):
+    """
+    Читает начало XML дампа.
+    
+    Returns:
+        str: Первые size байт дампа или None, если дамп не создан
+    """
+    try:
+        fd = os.open(dump_xml, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    except FileNotFoundError:
+        return None
+    try:
+        # Дамп отображается в память: при чтении начала файла
+        # подгружается только первая страница, даже для больших дампов
+        if not os.fstat(fd).st_size:
+            return ""
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:size].decode("utf-8", errors="replace")
+    finally:
+        os.close(fd)
+
+
+def check_programs(programs, work_dir):
+    """
+    Ассемблирует и выполняет программы, проверяет их дампы памяти.
+    
+    Ассемблер и интерпретатор вызываются по одному разу на весь набор
+    программ (режим --batch). Выходные файлы получают имена по программе,
+    поэтому программы можно проверять параллельно в одном рабочем
+    каталоге. Удаление файлов - забота владельца каталога.
     
-    # Шаг 1: Ассемблируем тестовую программу
-    print("\n1. Ассемблирование тестовой программы...")
-    result = subprocess.run(
-        [sys.executable, "assembler.py", "test_program.yaml", "test_output.bin"],
-        capture_output=True,
-        text=True
+    Ненулевой код возврата ассемблера или интерпретатора считается
+    ошибкой всех программ пакета: по коду возврата нельзя узнать,
+    какая из них не прошла.
+    
+    Args:
+        programs: Пути к YAML файлам программ
+        work_dir: Каталог для бинарных файлов и дампов памяти
+    
+    Returns:
+        list: Программы, не прошедшие проверку
+    """
+    outputs = {}
+    for program_yaml in programs:
+        name = os.path.splitext(os.path.basename(program_yaml))[0]
+        outputs[program_yaml] = (os.path.join(work_dir, f"{name}.bin"),
+                                 os.path.join(work_dir, f"{name}.xml"))
+    
+    print(f"\n📄 Программы: {', '.join(os.path.basename(path) for path in programs)}")
+    
+    # Шаг 1: Ассемблируем тестовые программы
+    print("\n1. Ассемблирование тестовых программ...")
+    returncode, output = _run_main(
+        assembler.main,
+        ["--batch"] + [f"{src}:{output_bin}" for src, (output_bin, _) in outputs.items()]
     )
     
-    if result.returncode != 0:
-        print(f"❌ Ошибка ассемблирования: {result.stderr}")
-        return False
+    failed = set()
+    if returncode != 0:
+        print(f"❌ Ошибка ассемблирования (код {returncode}): {output}")
+        failed.update(programs)
+    else:
+        print("✅ Ассемблирование успешно")
     
-    print("✅ Ассемблирование успешно")
+    # Бинарный файл не создается, если программа не ассемблирована
+    built = [src for src in programs if os.path.exists(outputs[src][0])]
+    failed.update(src for src in programs if src not in built)
+    if not built:
+        return [src for src in programs if src in failed]
     
     # Шаг 2: Запуск интерпретатора
     print("\n2. Запуск интерпретатора...")
-    result = subprocess.run(
-        [sys.executable, "interpreter.py", "test_output.bin", "--dump-memory"],
-        capture_output=True,
-        text=True
+    returncode, output = _run_main(
+        interpreter.main,
+        ["--batch"] + [f"{outputs[src][0]}:{outputs[src][1]}" for src in built]
     )
     
-    if result.returncode != 0:
-        print(f"❌ Ошибка интерпретатора: {result.stderr}")
-        return False
+    if returncode != 0:
+        print(f"❌ Ошибка интерпретатора (код {returncode}): {output}")
+        failed.update(built)
+    else:
+        print("✅ Интерпретатор успешно выполнил программы")
     
-    print("✅ Интерпретатор успешно выполнил программу")
+    # Шаг 3: Проверка существования дампов памяти
+    print("\n3. Проверка дампов памяти...")
+    for src in built:
+        content = _read_preview(outputs[src][1])
+        if content is None:
+            print(f"❌ XML дамп не создан: {os.path.basename(src)}")
+            failed.add(src)
+            continue
+        
+        print(f"✅ XML дамп памяти создан: {os.path.basename(src)}")
+        print(f"   Начало XML:\n{content}...")
     
-    # Шаг 3: Проверка существования дампа памяти
-    print("\n3. Проверка дампа памяти...")
-    if os.path.exists("memory_dump.xml"):
-        print("✅ XML дамп памяти создан")
+    return [src for src in programs if src in failed]
+
+
+def pytest_generate_tests(metafunc):
+    """Параметризует test_interpreter программами корпуса (хук pytest)."""
+    if "program_yaml" in metafunc.fixturenames:
+        metafunc.parametrize(
+            "program_yaml", PROGRAMS,
+            ids=[os.path.basename(path) for path in PROGRAMS]
+        )
+
+
+def test_interpreter(program_yaml, tmp_path):
+    """Тест pytest: одна программа корпуса в собственном временном каталоге."""
+    assert not check_programs([program_yaml], str(tmp_path))
+
+
+def _build_binary(work_dir, name, commands, tail=b""):
+    """
+    Кодирует команды в бинарный файл программы.
+    
+    Args:
+        work_dir: Каталог для бинарного файла
+        name: Имя программы
+        commands: Команды в виде кортежей (опкод, B, C)
+        tail: Байты, дописываемые после закодированных команд
         
-        # Читаем и выводим часть дампа
-        with open("memory_dump.xml", "r") as f:
-            content = f.read(500)
-            print(f"   Начало XML:\n{content}...")
+    Returns:
+        str: Путь к бинарному файлу
+    """
+    program = IntermediateProgram()
+    for opcode, b, c in commands:
+        program.append(opcode, b, c)
+    
+    path = os.path.join(str(work_dir), f"{name}.bin")
+    with open(path, "wb") as f:
+        f.write(CommandEncoder().encode_program(program) + tail)
+    return path
+
+
+def _run_both_paths(binary, work_dir, max_steps=1000):
+    """
+    Выполняет программу пошагово (verbose, step()) и быстрым циклом run_core.
+    
+    Состояния после выполнения обоими способами должны совпадать.
+    
+    Returns:
+        tuple: (pc, halted, статистика, регистры, XML дамп)
+    """
+    results = []
+    for verbose in (True, False):
+        mem = interpreter.UVMMemory(verbose=verbose)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            mem.load_program(binary)
+            mem.run(max_steps)
+            dump = mem.dump_memory_xml(output_path=os.path.join(str(work_dir), f"dump_{verbose}.xml"))
+        results.append((mem.pc, mem.halted, dict(mem.stats), list(mem.registers), dump))
+    
+    step_state, core_state = results
+    assert step_state == core_state, f"step(): {step_state}\nrun_core: {core_state}"
+    return core_state
+
+
+def test_run_core_opcode_subset(tmp_path):
+    """Цикл, специализированный под LOAD_CONST и WRITE_MEM, совпадает с step()."""
+    binary = _build_binary(tmp_path, "subset", [
+        (UVMSpec.LOAD_CONST, 5, 1),
+        (UVMSpec.LOAD_CONST, 42, 2),
+        (UVMSpec.WRITE_MEM, 1, 2),
+    ])
+    
+    pc, halted, stats, registers, dump = _run_both_paths(binary, tmp_path)
+    assert (pc, halted) == (12, True)
+    assert stats == {'instructions_executed': 3, 'memory_reads': 0, 'memory_writes': 1}
+    assert registers[1:3] == [5, 42]
+    assert '<memory_cell address="5" value="42" hex="0x2A"/>' in dump
+
+
+def test_run_core_all_opcodes(tmp_path):
+    """Все опкоды спецификации (включая ABS) дают то же состояние, что и step()."""
+    binary = _build_binary(tmp_path, "all", [
+        (UVMSpec.LOAD_CONST, 10, 1),
+        (UVMSpec.LOAD_CONST, 77, 2),
+        (UVMSpec.WRITE_MEM, 1, 2),
+        (UVMSpec.READ_MEM, 3, 1),
+        (UVMSpec.ABS, 3, 3),
+        (UVMSpec.LOAD_CONST, 11, 4),
+        (UVMSpec.WRITE_MEM, 4, 3),
+    ])
+    
+    pc, halted, stats, registers, dump = _run_both_paths(binary, tmp_path)
+    assert (pc, halted) == (28, True)
+    assert stats == {'instructions_executed': 7, 'memory_reads': 1, 'memory_writes': 2}
+    assert '<memory_cell address="11" value="77" hex="0x4D"/>' in dump
+
+
+def test_run_core_address_out_of_range(tmp_path):
+    """Адрес вне памяти данных останавливает оба цикла на той же инструкции."""
+    binary = _build_binary(tmp_path, "oob", [
+        (UVMSpec.LOAD_CONST, 5000, 1),
+        (UVMSpec.READ_MEM, 2, 1),
+        (UVMSpec.LOAD_CONST, 1, 3),
+    ])
+    
+    pc, halted, stats, registers, _ = _run_both_paths(binary, tmp_path)
+    assert (pc, halted) == (8, True)
+    assert stats['instructions_executed'] == 1
+    assert registers[3] == 0
+
+
+def test_run_core_truncated_word(tmp_path):
+    """Неполное слово в конце программы - ошибка декодирования в обоих циклах."""
+    binary = _build_binary(tmp_path, "tail", [(UVMSpec.LOAD_CONST, 7, 1)], tail=b"\x1d\x00")
+    
+    pc, halted, stats, registers, _ = _run_both_paths(binary, tmp_path)
+    assert (pc, halted) == (6, True)
+    assert stats['instructions_executed'] == 1
+    assert registers[1] == 7
+
+
+def test_run_core_max_steps(tmp_path):
+    """Лимит max_steps прерывает оба цикла после одинакового числа инструкций."""
+    binary = _build_binary(tmp_path, "limit",
+                           [(UVMSpec.LOAD_CONST, i + 1, i) for i in range(10)])
+    
+    pc, halted, stats, registers, _ = _run_both_paths(binary, tmp_path, max_steps=3)
+    assert (pc, halted) == (12, False)
+    assert stats['instructions_executed'] == 3
+    assert registers[:4] == [1, 2, 3, 0]
+
+
+def test_unknown_opcode_rejected_at_load(tmp_path):
+    """Программа с неизвестным опкодом отклоняется при загрузке целиком."""
+    binary = _build_binary(tmp_path, "unknown", [(UVMSpec.LOAD_CONST, 1, 1)],
+                           tail=(63).to_bytes(4, "little"))
+    
+    mem = interpreter.UVMMemory()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            mem.load_program(binary)
+    except ValueError as e:
+        assert "неизвестные опкоды: 63 (PC=4)" in str(e)
     else:
-        print("❌ XML дамп не создан")
-        return False
+        raise AssertionError("неизвестный опкод не вызвал ошибку при загрузке")
     
-    # Шаг 4: Очистка временных файлов
-    print("\n4. Очистка временных файлов...")
-    for file in ["test_output.bin", "memory_dump.xml"]:
-        if os.path.exists(file):
-            os.remove(file)
-            print(f"   Удален: {file}")
+    # CLI завершается с кодом 1, не выполнив ни одной инструкции
+    returncode, output = _run_main(interpreter.main, [binary])
+    assert returncode == 1
+    assert "63 (PC=4)" in output
+
+
+def main():
+    """Проверяет все программы корпуса одним пакетом, затем запускает остальные тесты."""
+    print("🧪 Тестирование интерпретатора УВМ (Этап 3)")
+    print("="*60)
+    
+    # Промежуточные файлы пишутся во временный каталог (tmpfs на Linux)
+    # и удаляются вместе с ним
+    with tempfile.TemporaryDirectory() as work_dir:
+        failed = [os.path.basename(path) for path in check_programs(PROGRAMS, work_dir)]
+    
+    # Тесты, не привязанные к корпусу программ: каждый в своем каталоге
+    print()
+    tests = [value for name, value in sorted(globals().items())
+             if name.startswith("test_") and name != "test_interpreter" and callable(value)]
+    for test in tests:
+        with tempfile.TemporaryDirectory() as tmp_path:
+            try:
+                test(tmp_path)
+            except Exception as e:
+                print(f"❌ {test.__name__}: {e!r}")
+                failed.append(test.__name__)
+            else:
+                print(f"✅ {test.__name__}")
     
     print("\n" + "="*60)
-    print("✅ ВСЕ ТЕСТЫ ПРОЙДЕНЫ УСПЕШНО!")
+    if failed:
+        print(f"❌ ТЕСТЫ НЕ ПРОЙДЕНЫ: {', '.join(failed)}")
+    else:
+        print("✅ ВСЕ ТЕСТЫ ПРОЙДЕНЫ УСПЕШНО!")
     print("="*60)
     
-    return True
+    return not failed
 
 if __name__ == "__main__":
-    if test_interpreter():
+    if main():
         sys.exit(0)
     else:
         sys.exit(1)